@@ -2,19 +2,23 @@ response = {
     "200": {
         "content": {
             "application/json": {
-                "example": [
-                    {
-                        "id": "1",
-                        "title": "Category 1",
-                    },
-                    {
-                        "id": "2",
-                        "title": "Category 2    ",
-                    },
-                ]
+                "example": {
+                    "items": [
+                        {
+                            "id": "1",
+                            "title": "Category 1",
+                        },
+                        {
+                            "id": "2",
+                            "title": "Category 2",
+                        },
+                    ],
+                    "next_cursor": "WzJd",
+                }
             }
         }
     },
+    "400": {"content": {"application/json": {"example": {"detail": "Invalid cursor"}}}},
     "401": {
         "content": {"application/json": {"example": {"detail": "Not authenticated"}}}
     },
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from .databases import AsyncSession
+from .models.cache_versions import CacheVersion
+from .models.categories import Category
+from .schemas.categories import CategoryResponseScheme
+from .settings import CATEGORY_CACHE_STALE_SECONDS
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiration
+
+    on_evict(key, value) is called for every entry leaving the cache.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def _evicted(self, key: Hashable, item: Optional[tuple]) -> None:
+        if item is not None and self.on_evict is not None:
+            self.on_evict(key, item[0])
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._evicted(key, item)
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        previous = self._data.get(key)
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        if previous is not None and previous[0] is not value:
+            self._evicted(key, previous)
+        while len(self._data) > self.max_size:
+            self._evicted(*self._data.popitem(last=False))
+
+    def invalidate(self, key: Hashable) -> None:
+        self._evicted(key, self._data.pop(key, None))
+
+    def clear(self) -> None:
+        items, self._data = self._data, OrderedDict()
+        for key, item in items.items():
+            self._evicted(key, item)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CategoryCache:
+    """In-process snapshot of the categories table with an id index
+
+    Category writes bump the "categories" row of cache_versions in their
+    transaction and invalidate the local snapshot. Other workers compare the
+    stored version with their snapshot at most every stale_seconds, so they
+    reload within that window and report the same version for the same data.
+    """
+
+    name = "categories"
+
+    def __init__(self, stale_seconds: float):
+        self.stale_seconds = stale_seconds
+        self.version: Optional[int] = None
+        self._categories: Optional[list] = None
+        self._by_id: dict = {}
+        self._checked_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def _current_version(self, db: AsyncSession) -> int:
+        version = await db.scalar(
+            select(CacheVersion.version).where(CacheVersion.name == self.name)
+        )
+        return version or 0
+
+    async def _load(self, db: AsyncSession, version: int) -> None:
+        async with self._lock:
+            if self._categories is not None and self.version == version:
+                return
+
+            categories_query = await db.execute(select(Category).order_by(Category.id))
+            categories = [
+                CategoryResponseScheme.from_orm(category)
+                for category in categories_query.scalars().all()
+            ]
+            self._categories = categories
+            self._by_id = {category.id: category for category in categories}
+            self.version = version
+
+    async def _refresh(self, db: AsyncSession) -> None:
+        now = time.monotonic()
+        if (
+            self._categories is not None
+            and self._checked_at is not None
+            and now - self._checked_at < self.stale_seconds
+        ):
+            return
+
+        version = await self._current_version(db)
+        if self._categories is None or version != self.version:
+            await self._load(db, version)
+        self._checked_at = now
+
+    async def all(self, db: AsyncSession) -> list:
+        await self._refresh(db)
+        return self._categories
+
+    async def get(self, db: AsyncSession, category_id: int):
+        await self._refresh(db)
+        return self._by_id.get(category_id)
+
+    async def bump_version(self, db: AsyncSession) -> None:
+        """Mark categories changed, call in the writing transaction"""
+        await db.execute(
+            insert(CacheVersion)
+            .values(name=self.name, version=1)
+            .on_conflict_do_update(
+                index_elements=[CacheVersion.name],
+                set_={"version": CacheVersion.version + 1},
+            )
+        )
+
+    def invalidate(self) -> None:
+        self._categories = None
+        self._by_id = {}
+        self._checked_at = None
+
+
+category_cache = CategoryCache(stale_seconds=CATEGORY_CACHE_STALE_SECONDS)
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import Integer, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from .databases import AsyncSession, SessionLocal
+from .models.posts import Post
+from .models.stats import UserStats
+from .schemas.posts import PostResponseScheme
+from .trending import trending_score_values
+from .settings import (
+    LIKES_WRITE_BEHIND,
+    LIKES_FLUSH_INTERVAL_SECONDS,
+    LIKES_FLUSH_MAX_PENDING,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LikeCounterBuffer:
+    """Aggregates likes_count deltas per post and flushes them in batches
+
+    user_stats.likes_received deltas of post owners are buffered alongside,
+    so likes don't lock the owner's stats row either.
+    """
+
+    def __init__(self, enabled: bool, interval: float, max_pending: int):
+        self.enabled = enabled
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending: dict[int, int] = {}
+        self._flushing: dict[int, int] = {}
+        self._received: dict[int, int] = {}
+        self._flushing_received: dict[int, int] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, post_id: int, delta: int, owner_id: Optional[int] = None) -> None:
+        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+        if owner_id is not None:
+            self._received[owner_id] = self._received.get(owner_id, 0) + delta
+
+        if len(self._pending) >= self.max_pending and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def pending(self, post_id: int) -> int:
+        """Delta not yet visible in posts.likes_count"""
+        return self._pending.get(post_id, 0) + self._flushing.get(post_id, 0)
+
+    def pending_received(self, user_id: int) -> int:
+        """Delta not yet visible in user_stats.likes_received"""
+        return self._received.get(user_id, 0) + self._flushing_received.get(user_id, 0)
+
+    def paused(self) -> asyncio.Lock:
+        """Hold with async with to keep pending deltas from being flushed"""
+        return self._lock
+
+    async def _write(self, session: AsyncSession, batch: dict, received: dict):
+        if batch:
+            deltas = values(
+                column("post_id", Integer), column("delta", Integer), name="deltas"
+            ).data(list(batch.items()))
+            await session.execute(
+                update(Post)
+                .where(Post.id == deltas.c.post_id)
+                .values(
+                    likes_count=func.coalesce(Post.likes_count, 0) + deltas.c.delta,
+                    **trending_score_values(deltas.c.delta),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        if received:
+            deltas = values(
+                column("user_id", Integer), column("delta", Integer), name="received"
+            ).data(list(received.items()))
+            received_insert = insert(UserStats).from_select(
+                ["user_id", "likes_received"], select(deltas.c.user_id, deltas.c.delta)
+            )
+            await session.execute(
+                received_insert.on_conflict_do_update(
+                    index_elements=[UserStats.user_id],
+                    set_={
+                        "likes_received": UserStats.likes_received
+                        + received_insert.excluded.likes_received
+                    },
+                )
+            )
+
+    async def flush(self) -> int:
+        """Write pending deltas with one UPDATE ... FROM (VALUES ...)"""
+        async with self._lock:
+            batch = {post_id: d for post_id, d in self._pending.items() if d}
+            received = {user_id: d for user_id, d in self._received.items() if d}
+            self._pending = {}
+            self._received = {}
+            if not batch and not received:
+                return 0
+
+            self._flushing = batch
+            self._flushing_received = received
+            committed = False
+            try:
+                async with SessionLocal() as session:
+                    await self._write(session, batch, received)
+                    await session.commit()
+                    # Deltas are in the tables now, don't count them twice
+                    committed = True
+                    self._flushing = {}
+                    self._flushing_received = {}
+            except BaseException as exc:
+                if not committed:
+                    # Put deltas back, they will be retried on the next flush
+                    self._flushing = {}
+                    self._flushing_received = {}
+                    for post_id, delta in batch.items():
+                        self._pending[post_id] = self._pending.get(post_id, 0) + delta
+                    for user_id, delta in received.items():
+                        self._received[user_id] = self._received.get(user_id, 0) + delta
+                if not isinstance(exc, Exception):
+                    raise
+                logger.exception("Failed to flush %s like counters", len(batch))
+                return 0
+
+            return len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            # Cancelling the loop in stop() must not interrupt a running flush
+            await asyncio.shield(self.flush())
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Waits for the lock, so a flush still running is finished first
+        await self.flush()
+
+
+like_counters = LikeCounterBuffer(
+    enabled=LIKES_WRITE_BEHIND,
+    interval=LIKES_FLUSH_INTERVAL_SECONDS,
+    max_pending=LIKES_FLUSH_MAX_PENDING,
+)
+
+
+def with_pending_likes(post: Post):
+    """Return post with buffered likes merged into likes_count"""
+    delta = like_counters.pending(post.id)
+    if not delta:
+        return post
+
+    post_scheme = PostResponseScheme.from_orm(post)
+    post_scheme.likes_count = (post_scheme.likes_count or 0) + delta
+    return post_scheme
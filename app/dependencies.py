@@ -1,8 +1,97 @@
-from typing import AsyncGenerator
-from .databases import SessionLocal
+import hashlib
+import logging
+import math
+import time
+from typing import AsyncGenerator, Optional
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from .cache import TTLCache
+from .databases import SessionLocal, ReadSessionLocal
+from .settings import READ_YOUR_WRITES_SECONDS, REPLICA_RETRY_SECONDS
 
+logger = logging.getLogger(__name__)
 
-async def get_db() -> AsyncGenerator:
+# Callers that committed recently, their reads go to the primary. The cookie
+# carries the commit time to other workers, the cache covers cookieless clients
+# of this worker.
+LAST_WRITE_COOKIE = "last_write"
+recent_writers = TTLCache(max_size=100000, ttl=READ_YOUR_WRITES_SECONDS)
+_replica_down_until = 0.0
+
+
+def _caller_key(request: Request) -> Optional[str]:
+    authorization = request.headers.get("Authorization")
+    if not authorization:
+        return None
+    return hashlib.sha256(authorization.encode()).hexdigest()
+
+
+@event.listens_for(Session, "after_commit")
+def _set_last_write_cookie(session: Session) -> None:
+    response = session.info.get("response")
+    if response is not None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            f"{time.time():.3f}",
+            max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
+
+
+def _wrote_recently(request: Request) -> bool:
+    cookie = request.cookies.get(LAST_WRITE_COOKIE)
+    if cookie is not None:
+        try:
+            elapsed = time.time() - float(cookie)
+        except ValueError:
+            elapsed = -1.0
+        # Negative elapsed is a forged or skewed cookie, ignore it
+        if 0 <= elapsed < READ_YOUR_WRITES_SECONDS:
+            return True
+
+    caller = _caller_key(request)
+    return caller is not None and recent_writers.get(caller, False)
+
+
+async def get_db(request: Request, response: Response) -> AsyncGenerator:
     """Return async session"""
     async with SessionLocal() as session:
+        # Commits made by the route set the last write cookie on its response
+        session.info["response"] = response
+        yield session
+
+        caller = _caller_key(request)
+        if caller is not None and session.info.get("committed"):
+            recent_writers.set(caller, True)
+
+
+async def get_read_db(request: Request) -> AsyncGenerator:
+    """Return async session on the read replica
+
+    Falls back to the primary when no replica is configured, the caller wrote
+    within READ_YOUR_WRITES_SECONDS (last write cookie from any worker, or
+    this worker's cache) or the replica is unavailable.
+    """
+    global _replica_down_until
+
+    use_primary = (
+        ReadSessionLocal is None
+        or time.monotonic() < _replica_down_until
+        or _wrote_recently(request)
+    )
+
+    session = SessionLocal() if use_primary else ReadSessionLocal()
+    if not use_primary:
+        try:
+            await session.connection()
+        except (OSError, SQLAlchemyError):
+            logger.warning("Read replica is unavailable, using primary", exc_info=True)
+            _replica_down_until = time.monotonic() + REPLICA_RETRY_SECONDS
+            await session.close()
+            session = SessionLocal()
+
+    async with session:
         yield session
@@ -0,0 +1,51 @@
+import csv
+import io
+from enum import Enum
+from typing import AsyncIterator
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from .databases import AsyncSession
+from .serialization import dumps
+from .settings import EXPORT_CHUNK_SIZE
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+async def _stream_rows(
+    db: AsyncSession, query: Select, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    """Read rows through a server-side cursor and yield them chunk by chunk"""
+    result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+
+    if export_format is ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.keys())
+        async for rows in result.partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        async for rows in result.partitions():
+            yield b"".join(dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+
+def export_response(
+    db: AsyncSession, query: Select, export_format: ExportFormat, filename: str
+) -> StreamingResponse:
+    filename = f"{filename}.{export_format.value}"
+    return StreamingResponse(
+        _stream_rows(db, query, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
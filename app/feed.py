@@ -0,0 +1,181 @@
+import heapq
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, tuple_
+from .cache import TTLCache
+from .databases import AsyncSession
+from .models.likes import Like
+from .models.posts import Post
+from .settings import (
+    FEED_CACHE_USERS,
+    FEED_CACHE_SIZE,
+    FEED_RECENT_SIZE,
+    FEED_CACHE_TTL_SECONDS,
+)
+
+# Feed entries are (time_created, id) keys ordered newest first
+FeedKey = tuple[datetime, int]
+
+
+def insert_key(keys: deque, key: FeedKey) -> None:
+    """Insert key keeping keys sorted newest first
+
+    Commits can finish out of id order, so new posts are not always newest.
+    A full deque drops its oldest key, or the new key if it is older than all.
+    """
+    index = 0
+    while index < len(keys) and keys[index] > key:
+        index += 1
+    if index < len(keys) and keys[index] == key:
+        return
+    if len(keys) == keys.maxlen:
+        if index == len(keys):
+            return
+        keys.pop()
+    keys.insert(index, key)
+
+
+class UserFeed:
+    """Newest posts from categories the user liked posts in"""
+
+    def __init__(self, categories: frozenset, keys: list, size: int):
+        self.categories = categories
+        self.keys: deque = deque(keys, maxlen=size)
+        # False when older posts exist beyond the cached keys
+        self.complete = len(keys) < size
+
+
+class FeedCache:
+    """Per-user precomputed feeds plus shared list of recent global posts"""
+
+    def __init__(self, max_users: int, size: int, recent_size: int, ttl: float):
+        self.size = size
+        self.recent_size = recent_size
+        self.ttl = ttl
+        self._users = TTLCache(max_size=max_users, ttl=ttl, on_evict=self._unsubscribe)
+        # category id -> ids of users with a cached feed, kept in step with _users
+        self._subscribers: dict[int, set] = {}
+        self._recent: Optional[deque] = None
+        self._recent_loaded_at = 0.0
+
+    def _unsubscribe(self, user_id: int, feed: UserFeed) -> None:
+        for category_id in feed.categories:
+            subscribers = self._subscribers.get(category_id)
+            if subscribers is not None:
+                subscribers.discard(user_id)
+                if not subscribers:
+                    del self._subscribers[category_id]
+
+    def _store(self, user_id: int, feed: UserFeed) -> None:
+        self._users.set(user_id, feed)
+        for category_id in feed.categories:
+            self._subscribers.setdefault(category_id, set()).add(user_id)
+
+    async def _user_feed(self, db: AsyncSession, user_id: int) -> UserFeed:
+        feed = self._users.get(user_id)
+        if feed is not None:
+            return feed
+
+        categories_query = await db.execute(
+            select(Post.category_id)
+            .join(Like, Like.post_id == Post.id)
+            .where(Like.user_id == user_id, Like.liked == True)
+            .distinct()
+        )
+        categories = frozenset(categories_query.scalars().all())
+
+        keys = []
+        if categories:
+            keys_query = await db.execute(
+                select(Post.time_created, Post.id)
+                .where(Post.category_id.in_(categories))
+                .order_by(Post.time_created.desc(), Post.id.desc())
+                .limit(self.size)
+            )
+            keys = [tuple(row) for row in keys_query.all()]
+
+        feed = UserFeed(categories, keys, self.size)
+        self._store(user_id, feed)
+        return feed
+
+    async def _recent_posts(self, db: AsyncSession) -> deque:
+        expired = time.monotonic() - self._recent_loaded_at > self.ttl
+        if self._recent is None or expired:
+            keys_query = await db.execute(
+                select(Post.time_created, Post.id)
+                .order_by(Post.time_created.desc(), Post.id.desc())
+                .limit(self.recent_size)
+            )
+            self._recent = deque(
+                (tuple(row) for row in keys_query.all()), maxlen=self.recent_size
+            )
+            self._recent_loaded_at = time.monotonic()
+        return self._recent
+
+    def on_post_created(self, post: Post) -> None:
+        key = (post.time_created, post.id)
+        if self._recent is not None:
+            insert_key(self._recent, key)
+
+        subscribers = self._subscribers.get(post.category_id, set())
+        for user_id in list(subscribers):
+            feed = self._users.get(user_id)
+            if feed is None:
+                continue
+
+            if len(feed.keys) == feed.keys.maxlen:
+                feed.complete = False
+            insert_key(feed.keys, key)
+
+    def on_like(self, user_id: int, category_id: int) -> None:
+        """Rebuild feed when the user likes a post from a new category"""
+        feed = self._users.get(user_id)
+        if feed is not None and category_id not in feed.categories:
+            self._users.invalidate(user_id)
+
+    def on_unlike(self, user_id: int, category_id: int) -> None:
+        """Rebuild feed, the category may have lost its last liked post"""
+        feed = self._users.get(user_id)
+        if feed is not None and category_id in feed.categories:
+            self._users.invalidate(user_id)
+
+    async def page(
+        self, db: AsyncSession, user_id: int, after: Optional[FeedKey], count: int
+    ) -> list:
+        """Return up to count feed keys older than after"""
+        feed = await self._user_feed(db, user_id)
+        recent = await self._recent_posts(db)
+
+        keys: list[FeedKey] = []
+        for key in heapq.merge(feed.keys, recent, reverse=True):
+            if (after is None or key < after) and (not keys or key != keys[-1]):
+                keys.append(key)
+                if len(keys) == count:
+                    break
+
+        if feed.complete or (len(keys) == count and keys[-1] >= feed.keys[-1]):
+            return keys
+
+        # Requested range reaches past the cached posts of user categories
+        boundary = feed.keys[-1] if after is None else min(feed.keys[-1], after)
+        keys_query = await db.execute(
+            select(Post.time_created, Post.id)
+            .where(
+                Post.category_id.in_(feed.categories),
+                tuple_(Post.time_created, Post.id) < tuple_(*boundary),
+            )
+            .order_by(Post.time_created.desc(), Post.id.desc())
+            .limit(count)
+        )
+        keys = set(keys).union(tuple(row) for row in keys_query.all())
+        return sorted(keys, reverse=True)[:count]
+
+
+feed_cache = FeedCache(
+    max_users=FEED_CACHE_USERS,
+    size=FEED_CACHE_SIZE,
+    recent_size=FEED_RECENT_SIZE,
+    ttl=FEED_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,93 @@
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .settings import DEBUG, SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Database work done while handling one request"""
+
+    __slots__ = ("queries", "db_time", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        # Executions per statement text, only tracked in DEBUG
+        self.statements: Counter = Counter()
+
+
+# Set by MetricsMiddleware, SQLAlchemy's greenlets inherit the context
+current_request: ContextVar[Optional[RequestStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+def redact(parameters: Any, executemany: bool = False) -> Any:
+    """Replace bound values with their type names so logs never carry user data"""
+    if executemany:
+        return f"<{len(parameters)} rows>"
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _, started = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started
+
+    if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s parameters=%s",
+            elapsed * 1000,
+            statement,
+            redact(parameters, executemany),
+        )
+
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+        if DEBUG:
+            stats.statements[statement] += 1
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute, drop its start time
+    connection = exception_context.connection
+    if connection is None:
+        return
+    starts = connection.info.get("query_start")
+    if starts and starts[-1][0] is exception_context.execution_context:
+        starts.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attribute statements executed on engine to the current request"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+def report_repeated_statements(method: str, route: str, stats: RequestStats) -> None:
+    """Warn about statements repeated within one request (likely N+1 queries)"""
+    for statement, count in stats.statements.items():
+        if count > N_PLUS_ONE_THRESHOLD:
+            logger.warning(
+                "Possible N+1: %s %s executed %s times: %s",
+                method,
+                route,
+                count,
+                statement,
+            )
@@ -1,11 +1,19 @@
-import uvicorn
 from fastapi import FastAPI
-from .settings import INIT_TABLES, DEBUG
-from .databases import engine, Base
+from .settings import INIT_TABLES, DEBUG, SCHEMA_MODE
+from .databases import engine, read_engine, Base
+from .metrics import MetricsMiddleware
+from .schema import verify_schema
 from .routers import users
 from .routers import categories
 from .routers import posts
 from .routers import likes
+from .routers import stats
+from .routers import health
+from .routers import metrics
+from .counters import like_counters
+from .reconcile import start_reconcile_task, stop_reconcile_task
+from .trending import trending
+from .warmup import warmup
 
 
 if DEBUG:
@@ -15,11 +23,16 @@ else:
         title="Social Network API", version="1.0.0", redoc_url=None, docs_url=None
     )
 
+app.add_middleware(MetricsMiddleware)
+
 """Include routers"""
 app.include_router(users.router)
 app.include_router(categories.router)
 app.include_router(posts.router)
 app.include_router(likes.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
 """"""
 
 
@@ -30,9 +43,29 @@ async def startup():
         if INIT_TABLES:
             await conn.run_sync(Base.metadata.drop_all)
             await conn.run_sync(Base.metadata.create_all)
-        else:
+        elif SCHEMA_MODE == "create":
             await conn.run_sync(Base.metadata.create_all)
+        else:
+            await verify_schema(conn)
+
+    like_counters.start()
+    start_reconcile_task()
+    trending.start()
+    warmup.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    warmup.stop()
+    stop_reconcile_task()
+    trending.stop()
+    await like_counters.stop()
+    await engine.dispose()
+    if read_engine is not None:
+        await read_engine.dispose()
 
 
 if __name__ == "__main__":
-    uvicorn.run(app=app, host="127.0.0.1", port=8000)
+    from .serve import main
+
+    main()
@@ -0,0 +1,145 @@
+import time
+from bisect import bisect_left
+from typing import Iterable
+from .instrumentation import RequestStats, current_request, report_repeated_statements
+from .settings import DB_STATS_HEADERS
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+class Metrics:
+    """Per-route request metrics rendered in Prometheus text format"""
+
+    def __init__(self):
+        self.requests: dict[tuple, int] = {}
+        self.latency: dict[tuple, Histogram] = {}
+        self.db_time: dict[tuple, Histogram] = {}
+        self.db_queries: dict[tuple, Histogram] = {}
+        self.in_flight = 0
+
+    def observe(
+        self, method: str, route: str, status: int, seconds: float, stats: RequestStats
+    ) -> None:
+        key = (method, route)
+        status_key = (method, route, status)
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+
+        if key not in self.latency:
+            self.latency[key] = Histogram(LATENCY_BUCKETS)
+            self.db_time[key] = Histogram(LATENCY_BUCKETS)
+            self.db_queries[key] = Histogram(QUERY_BUCKETS)
+        self.latency[key].observe(seconds)
+        self.db_time[key].observe(stats.db_time)
+        self.db_queries[key].observe(stats.queries)
+
+    def _render_histograms(
+        self, name: str, help_text: str, histograms: dict
+    ) -> Iterable[str]:
+        yield f"# HELP {name} {help_text}"
+        yield f"# TYPE {name} histogram"
+        for (method, route), histogram in histograms.items():
+            labels = _labels(method=method, route=route)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+            yield f"{name}_sum{{{labels}}} {histogram.sum}"
+            yield f"{name}_count{{{labels}}} {histogram.count}"
+
+    def render(self, gauges: dict[str, float], counters: dict[str, float]) -> str:
+        lines = [
+            "# HELP http_requests_total Requests by route and status",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in self.requests.items():
+            labels = _labels(method=method, route=route, status=status)
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines.extend(
+            self._render_histograms(
+                "http_request_duration_seconds", "Request latency", self.latency
+            )
+        )
+        lines.extend(
+            self._render_histograms(
+                "http_request_db_seconds", "Database time per request", self.db_time
+            )
+        )
+        lines.extend(
+            self._render_histograms(
+                "http_request_db_queries", "Queries per request", self.db_queries
+            )
+        )
+
+        gauges = {"http_requests_in_flight": self.in_flight, **gauges}
+        for metric_type, values in (("gauge", gauges), ("counter", counters)):
+            for name, value in values.items():
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and database usage"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if DB_STATS_HEADERS:
+                    # Covers queries run before the response started
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"x-db-time", f"{stats.db_time * 1000:.1f}".encode()),
+                    ]
+            await send(message)
+
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            # Templated path of the matched route keeps label cardinality bounded
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(
+                scope["method"], route, status_code, time.perf_counter() - start, stats
+            )
+            report_repeated_statements(scope["method"], route, stats)
+            current_request.reset(token)
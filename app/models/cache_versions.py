@@ -0,0 +1,13 @@
+import sqlalchemy
+from ..databases import Base
+
+
+class CacheVersion(Base):
+    """Version of cached data, bumped in the transaction that changes it"""
+
+    __tablename__ = "cache_versions"
+
+    name = sqlalchemy.Column(sqlalchemy.String, primary_key=True)
+    version = sqlalchemy.Column(
+        sqlalchemy.BigInteger, nullable=False, default=0, server_default="0"
+    )
@@ -5,6 +5,14 @@ from ..databases import Base
 
 class Like(Base):
     __tablename__ = "likes"
+    __table_args__ = (
+        sqlalchemy.UniqueConstraint(
+            "post_id", "user_id", name="uq_likes_post_id_user_id"
+        ),
+        sqlalchemy.Index(
+            "ix_likes_user_id_liked_post_id", "user_id", "liked", "post_id"
+        ),
+    )
 
     id = sqlalchemy.Column(
         sqlalchemy.Integer, autoincrement=True, primary_key=True, index=True
@@ -1,18 +1,35 @@
 import sqlalchemy
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from ..databases import Base
+from ..settings import SEARCH_LANGUAGE
+
+# Title matches rank above content matches
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_LANGUAGE}', coalesce(content, '')), 'B')"
+)
 
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        sqlalchemy.Index("ix_posts_time_created_id", "time_created", "id"),
+        sqlalchemy.Index(
+            "ix_posts_user_id_time_created_id", "user_id", "time_created", "id"
+        ),
+        sqlalchemy.Index(
+            "ix_posts_search_vector", "search_vector", postgresql_using="gin"
+        ),
+    )
 
     id = sqlalchemy.Column(
         sqlalchemy.Integer, autoincrement=True, primary_key=True, index=True
     )
     title = sqlalchemy.Column(sqlalchemy.String, nullable=False)
     category_id = sqlalchemy.Column(
-        sqlalchemy.Integer, sqlalchemy.ForeignKey("categories.id")
+        sqlalchemy.Integer, sqlalchemy.ForeignKey("categories.id"), index=True
     )
     content = sqlalchemy.Column(sqlalchemy.Text, nullable=False)
     user_id = sqlalchemy.Column(sqlalchemy.Integer, sqlalchemy.ForeignKey("users.id"))
@@ -23,6 +40,20 @@ class Post(Base):
         sqlalchemy.DateTime(timezone=True), onupdate=func.now(), nullable=True
     )
     likes_count = sqlalchemy.Column(sqlalchemy.Integer, default=0)
+    # Time-decayed like score as of trending_updated, see app.trending
+    trending_score = sqlalchemy.Column(
+        sqlalchemy.Float, nullable=False, default=0, server_default="0"
+    )
+    trending_updated = sqlalchemy.Column(
+        sqlalchemy.DateTime(timezone=True), nullable=True, index=True
+    )
+    # Generated by the database, deferred so regular post queries skip it
+    search_vector = deferred(
+        sqlalchemy.Column(
+            TSVECTOR,
+            sqlalchemy.Computed(SEARCH_VECTOR, persisted=True),
+        )
+    )
 
     users = relationship("User", backref="posts")
     categories = relationship("Category", backref="posts")
@@ -0,0 +1,31 @@
+import sqlalchemy
+from ..databases import Base
+
+
+class CategoryStats(Base):
+    __tablename__ = "category_stats"
+
+    category_id = sqlalchemy.Column(
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("categories.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    posts_count = sqlalchemy.Column(
+        sqlalchemy.Integer, nullable=False, default=0, server_default="0"
+    )
+
+
+class UserStats(Base):
+    __tablename__ = "user_stats"
+
+    user_id = sqlalchemy.Column(
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    posts_count = sqlalchemy.Column(
+        sqlalchemy.Integer, nullable=False, default=0, server_default="0"
+    )
+    likes_received = sqlalchemy.Column(
+        sqlalchemy.Integer, nullable=False, default=0, server_default="0"
+    )
@@ -11,6 +11,10 @@ class User(Base):
     email = sqlalchemy.Column(sqlalchemy.String, unique=True, nullable=False)
     password = sqlalchemy.Column(sqlalchemy.String, nullable=False)
     is_admin = sqlalchemy.Column(sqlalchemy.Boolean, default=False)
+    # Bumped to revoke all issued access tokens
+    token_version = sqlalchemy.Column(
+        sqlalchemy.Integer, nullable=False, default=0, server_default="0"
+    )
 
     def __str__(self):
         return self.email
@@ -0,0 +1,57 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import Select, tuple_
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque cursor"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode cursor created by encode_cursor back into typed keyset values"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError(cursor)
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for value, type_ in zip(payload, types)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+
+
+def keyset(
+    query: Select,
+    columns: Sequence,
+    types: Sequence[type],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Select:
+    """Apply keyset condition, ordering and limit (one extra row to detect next page)"""
+    if cursor is not None:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, *types))
+        query = query.where(key < values if descending else key > values)
+
+    order = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def page(rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> dict:
+    """Build page response from rows fetched with keyset()"""
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(*key(items[-1]))
+
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import case, func, select, update
+from .counters import like_counters
+from .databases import SessionLocal
+from .models.likes import Like
+from .models.posts import Post
+from .settings import (
+    RECONCILE_BATCH_SIZE,
+    RECONCILE_ON_STARTUP,
+    RECONCILE_INTERVAL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_likes_count(batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """Recompute posts.likes_count from likes, return number of corrected posts
+
+    Posts are processed in id ranges of batch_size, each in its own short
+    transaction, and only rows whose counter differs are updated (and locked).
+    Likes buffered in this worker are already counted in the likes table, so
+    their pending deltas are subtracted while flushes are paused. Likes
+    buffered by other workers, or committed here between reading the deltas
+    and the recount snapshot, are counted twice until the next run.
+    """
+    await like_counters.flush()
+
+    corrected = 0
+    last_id = 0
+    async with SessionLocal() as session:
+        while True:
+            ids_query = await session.execute(
+                select(Post.id)
+                .where(Post.id > last_id)
+                .order_by(Post.id)
+                .limit(batch_size)
+            )
+            ids = ids_query.scalars().all()
+            if not ids:
+                break
+
+            counts = (
+                select(
+                    Post.id.label("post_id"),
+                    func.count(Like.id).filter(Like.liked == True).label("likes_count"),
+                )
+                .select_from(Post)
+                .outerjoin(Like, Like.post_id == Post.id)
+                .where(Post.id.between(ids[0], ids[-1]))
+                .group_by(Post.id)
+                .subquery()
+            )
+            async with like_counters.paused():
+                buffered = {}
+                for post_id in ids:
+                    delta = like_counters.pending(post_id)
+                    if delta:
+                        buffered[post_id] = delta
+                likes_count = counts.c.likes_count
+                if buffered:
+                    likes_count = likes_count - case(
+                        buffered, value=counts.c.post_id, else_=0
+                    )
+
+                corrected_query = await session.execute(
+                    update(Post)
+                    .where(
+                        Post.id == counts.c.post_id,
+                        Post.likes_count.is_distinct_from(likes_count),
+                    )
+                    .values(likes_count=likes_count)
+                    .returning(Post.id)
+                    .execution_options(synchronize_session=False)
+                )
+                corrected += len(corrected_query.all())
+                await session.commit()
+            last_id = ids[-1]
+
+    logger.info("Reconciled likes_count, %s posts corrected", corrected)
+    return corrected
+
+
+async def _run_reconcile(interval: float, run_now: bool) -> None:
+    while True:
+        if run_now:
+            try:
+                await reconcile_likes_count()
+            except Exception:
+                logger.exception("likes_count reconciliation failed")
+        if not interval:
+            return
+        await asyncio.sleep(interval)
+        run_now = True
+
+
+_reconcile_task: Optional[asyncio.Task] = None
+
+
+def start_reconcile_task() -> None:
+    """Start reconciliation according to RECONCILE_* settings"""
+    global _reconcile_task
+
+    if RECONCILE_ON_STARTUP or RECONCILE_INTERVAL_SECONDS:
+        _reconcile_task = asyncio.create_task(
+            _run_reconcile(RECONCILE_INTERVAL_SECONDS, RECONCILE_ON_STARTUP)
+        )
+
+
+def stop_reconcile_task() -> None:
+    global _reconcile_task
+
+    if _reconcile_task is not None:
+        _reconcile_task.cancel()
+        _reconcile_task = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute posts.likes_count from the likes table"
+    )
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(f"Corrected posts: {asyncio.run(reconcile_likes_count(args.batch_size))}")
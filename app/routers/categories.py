@@ -1,10 +1,14 @@
-from typing import Sequence
+from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from ..tags import Tags
 from fastapi import status
-from fastapi import APIRouter, Depends, HTTPException
-from ..schemas.categories import CategoryRequestScheme, CategoryResponseScheme
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from ..schemas.categories import (
+    CategoryRequestScheme,
+    CategoryResponseScheme,
+    CategoryPageScheme,
+)
 from ..Responses.categories import (
     categories_create,
     categories_list,
@@ -12,10 +16,15 @@ from ..Responses.categories import (
     categories_delete,
 )
 from ..databases import AsyncSession
-from ..dependencies import get_db
+from ..dependencies import get_db, get_read_db
 from ..models.categories import Category
 from ..utils import is_admin_user, get_current_user
 from ..models.users import User
+from ..pagination import decode_cursor, page
+from ..settings import PAGE_SIZE, MAX_PAGE_SIZE
+from ..cache import category_cache
+from ..etags import make_etag, etag_matches, not_modified
+from ..serialization import FastJSONResponse
 
 router = APIRouter(prefix="/api/categories")
 
@@ -50,8 +59,10 @@ async def category_create(
 
     category = Category(**category_item.dict())
     db.add(category)
+    await category_cache.bump_version(db)
     await db.commit()
     await db.refresh(category)
+    category_cache.invalidate()
 
     return category
 
@@ -62,17 +73,46 @@ async def category_create(
     description="""**List of categories**""",
     tags=[Tags.categories],
     status_code=status.HTTP_200_OK,
-    response_model=list[CategoryResponseScheme],
+    response_model=CategoryPageScheme,
     responses={
         200: categories_list.response["200"],
+        400: categories_list.response["400"],
         401: categories_list.response["401"],
     },
 )
 async def list_of_categories(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
-) -> Sequence[Category]:
-    categories_query = await db.execute(select(Category))
-    return categories_query.scalars().all()
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    categories = await category_cache.all(db)
+
+    if cursor is not None:
+        (last_id,) = decode_cursor(cursor, int)
+        categories = [category for category in categories if category.id > last_id]
+
+    result = page(categories[: limit + 1], limit, lambda c: (c.id,))
+    result["items"] = [
+        {"id": category.id, "title": category.title} for category in result["items"]
+    ]
+
+    etag = make_etag(
+        "categories",
+        result["next_cursor"],
+        *(f"{category['id']}:{category['title']}" for category in result["items"]),
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        result,
+        headers={
+            "ETag": etag,
+            "X-Categories-Version": str(category_cache.version),
+        },
+    )
 
 
 @router.get(
@@ -90,23 +130,24 @@ async def list_of_categories(
 )
 async def get_category(
     category_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
 ) -> CategoryResponseScheme:
-    category_query = await db.execute(
-        select(Category).where(Category.id == category_id)
-    )
-
-    try:
-        category = category_query.scalar_one()
-    except NoResultFound:
-        category = None
+    category = await category_cache.get(db, category_id)
 
     if category is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category was not found"
         )
 
+    etag = make_etag("category", category.id, category.title)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["X-Categories-Version"] = str(category_cache.version)
     return category
 
 
@@ -145,8 +186,10 @@ async def update_category(
         )
     category.title = category_scheme.title
     db.add(category)
+    await category_cache.bump_version(db)
     await db.commit()
     await db.refresh(category)
+    category_cache.invalidate()
 
     return category
 
@@ -183,4 +226,6 @@ async def delete_category(
         )
 
     await db.delete(category)
+    await category_cache.bump_version(db)
     await db.commit()
+    category_cache.invalidate()
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, HTTPException, status
+from ..tags import Tags
+from ..databases import engine, read_engine
+from ..utils import decoded_tokens, token_versions
+from ..warmup import warmup
+
+router = APIRouter(prefix="/api/health")
+
+
+def _pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+        **pool.stats.snapshot(),
+    }
+
+
+@router.get(
+    "/pool",
+    summary="Connection pool stats",
+    description="""**Connection pool usage and checkout wait time**""",
+    tags=[Tags.health],
+    status_code=status.HTTP_200_OK,
+)
+async def pool_status() -> dict:
+    pool_stats = _pool_status(engine.pool)
+    if read_engine is not None:
+        pool_stats["replica"] = _pool_status(read_engine.pool)
+    return pool_stats
+
+
+@router.get(
+    "/caches",
+    summary="Cache stats",
+    description="""**Size and hit/miss counters of in-process caches**""",
+    tags=[Tags.health],
+    status_code=status.HTTP_200_OK,
+)
+async def cache_status() -> dict:
+    return {
+        "decoded_tokens": decoded_tokens.stats(),
+        "token_versions": token_versions.stats(),
+    }
+
+
+@router.get(
+    "/ready",
+    summary="Readiness",
+    description="""**Ready once connection pool warm-up finished**""",
+    tags=[Tags.health],
+    status_code=status.HTTP_200_OK,
+)
+async def readiness() -> dict:
+    if not warmup.ready:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Warming up"
+        )
+    return {"ready": True}
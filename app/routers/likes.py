@@ -1,4 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import CTE, Select, Update, case, func, not_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.sql import select
 from app.models.likes import Like
@@ -8,11 +10,55 @@ from ..databases import AsyncSession
 from ..dependencies import get_db
 from ..models.posts import Post
 from ..utils import get_current_user
+from ..counters import like_counters
+from ..trending import trending, trending_score_values
+from ..feed import feed_cache
+from ..stats import add_likes_received
 
 
 router = APIRouter(prefix="/api/likes")
 
 
+def toggle_like(post_id: int, user_id: int) -> CTE:
+    """Upsert flipping the like of user on post, returns post_id and liked"""
+    return (
+        insert(Like)
+        .values(post_id=post_id, user_id=user_id, liked=True)
+        .on_conflict_do_update(
+            constraint="uq_likes_post_id_user_id",
+            set_={"liked": not_(func.coalesce(Like.liked, False))},
+        )
+        .returning(Like.post_id, Like.liked)
+        .cte("toggled")
+    )
+
+
+def select_toggled(toggled: CTE) -> Select:
+    """Toggle, return liked and the stored likes_count (write-behind mode)"""
+    return select(toggled.c.liked, Post.likes_count).where(Post.id == toggled.c.post_id)
+
+
+def count_toggled(toggled: CTE) -> Update:
+    """Toggle and apply the delta to likes_count and trending_score"""
+    # Core UPDATE on the table, the ORM cannot return columns of the CTE
+    posts = Post.__table__
+    delta = case((toggled.c.liked, 1), else_=-1)
+    return (
+        update(posts)
+        .where(posts.c.id == toggled.c.post_id)
+        .values(
+            likes_count=func.coalesce(posts.c.likes_count, 0) + delta,
+            **trending_score_values(delta),
+        )
+        .returning(
+            posts.c.likes_count,
+            toggled.c.liked,
+            posts.c.trending_score,
+            posts.c.trending_updated,
+        )
+    )
+
+
 @router.post(
     "/add/{post_id}",
     summary="Add like to post",
@@ -25,48 +71,43 @@ async def add_like(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ) -> dict:
-    posts_query = await db.execute(select(Post).where(Post.id == post_id))
+    owner_query = await db.execute(
+        select(Post.user_id, Post.category_id).where(Post.id == post_id)
+    )
 
     try:
-        post = posts_query.scalar_one()
+        owner_id, category_id = owner_query.one()
     except NoResultFound:
-        post = None
-
-    if post is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post was not found"
         )
 
-    if post.user_id == user.id:
+    if owner_id == user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Owner of the post cannot like it",
         )
 
-    post_like_query = await db.execute(
-        select(Like).where(Like.post_id == post_id, Like.user_id == user.id)
-    )
-
-    try:
-        posts_likes = post_like_query.scalar_one()
-    except NoResultFound:
-        posts_likes = None
-
-    if posts_likes is None:
-        like = Like(post_id=post_id, user_id=user.id, liked=True)
-        post.likes_count += 1
-        db.add(like)
+    # Toggle like and adjust counter in one statement, so concurrent likes
+    # on the same post cannot lose increments. In write-behind mode the counter
+    # delta is buffered and flushed in batches by like_counters.
+    toggled = toggle_like(post_id, user.id)
+    if like_counters.enabled:
+        toggle_query = await db.execute(select_toggled(toggled))
+        liked, likes_count = toggle_query.one()
         await db.commit()
-        return {"message": "Post was successfully liked"}
-
+        like_counters.add(post_id, 1 if liked else -1, owner_id=owner_id)
+        likes_count = (likes_count or 0) + like_counters.pending(post_id)
+        trending.add(post_id, category_id, 1 if liked else -1)
     else:
-        if posts_likes.liked:
-            posts_likes.liked = False
-            post.likes_count -= 1
-            await db.commit()
-            return {"message": "Post was successfully unliked"}
-        else:
-            posts_likes.liked = True
-            post.likes_count += 1
-            await db.commit()
-            return {"message": "Post was successfully liked"}
+        counter_query = await db.execute(count_toggled(toggled))
+        likes_count, liked, score, score_updated = counter_query.one()
+        await add_likes_received(db, owner_id, 1 if liked else -1)
+        await db.commit()
+        trending.set(post_id, category_id, score, score_updated.timestamp())
+
+    if liked:
+        feed_cache.on_like(user.id, category_id)
+        return {"message": "Post was successfully liked", "likes_count": likes_count}
+    feed_cache.on_unlike(user.id, category_id)
+    return {"message": "Post was successfully unliked", "likes_count": likes_count}
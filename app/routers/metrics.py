@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..databases import engine, read_engine
+from ..metrics import metrics
+from ..utils import decoded_tokens, token_versions
+
+router = APIRouter()
+
+
+def _pool_metrics(prefix: str, pool) -> tuple[dict, dict]:
+    gauges = {
+        f"{prefix}_size": pool.size(),
+        f"{prefix}_checked_out": pool.checkedout(),
+        f"{prefix}_overflow": pool.overflow(),
+        f"{prefix}_wait_seconds_max": pool.stats.wait_seconds_max,
+    }
+    counters = {
+        f"{prefix}_checkouts_total": pool.stats.checkouts,
+        f"{prefix}_slow_checkouts_total": pool.stats.slow_checkouts,
+        f"{prefix}_wait_seconds_total": pool.stats.wait_seconds_total,
+    }
+    return gauges, counters
+
+
+@router.get("/metrics", include_in_schema=False, response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    gauges, counters = _pool_metrics("db_pool", engine.pool)
+    if read_engine is not None:
+        replica_gauges, replica_counters = _pool_metrics(
+            "db_replica_pool", read_engine.pool
+        )
+        gauges.update(replica_gauges)
+        counters.update(replica_counters)
+
+    counters.update(
+        {
+            "token_cache_hits_total": decoded_tokens.hits,
+            "token_cache_misses_total": decoded_tokens.misses,
+            "token_version_cache_hits_total": token_versions.hits,
+            "token_version_cache_misses_total": token_versions.misses,
+        }
+    )
+    return PlainTextResponse(
+        metrics.render(gauges, counters), media_type="text/plain; version=0.0.4"
+    )
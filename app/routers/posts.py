@@ -1,22 +1,89 @@
-from typing import Sequence
-from sqlalchemy import select
+from datetime import datetime
+from typing import Optional, Sequence
+from sqlalchemy import Row, func, select
 from sqlalchemy.exc import NoResultFound
 
 from app.models.likes import Like
 from ..tags import Tags
 from fastapi import status
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
 from ..databases import AsyncSession
-from ..dependencies import get_db
+from ..dependencies import get_db, get_read_db
 from ..models.posts import Post
-from ..utils import get_current_user
+from ..utils import get_current_user, is_admin_user
 from ..models.users import User
-from ..models.categories import Category
-from ..schemas.posts import PostRequestScheme, PostResponseScheme
+from ..schemas.posts import PostRequestScheme, PostResponseScheme, PostPageScheme
+from ..schemas.posts import PostSearchPageScheme
 from ..Responses.posts import post_create, post_list, post_one
+from ..pagination import keyset, page, decode_cursor, encode_cursor
+from ..settings import PAGE_SIZE, MAX_PAGE_SIZE, TRENDING_PAGE_SIZE, TRENDING_TOP_K
+from ..settings import SEARCH_LANGUAGE, SEARCH_HEADLINE_OPTIONS
+from ..counters import like_counters, with_pending_likes
+from ..cache import category_cache
+from ..etags import make_etag, etag_matches, not_modified
+from ..serialization import FastJSONResponse
+from ..exports import ExportFormat, export_response
+from ..trending import trending
+from ..feed import feed_cache
+from ..stats import add_post_counts, add_likes_received
 
 router = APIRouter(prefix="/api/posts")
 
+POST_KEYSET = (Post.time_created, Post.id)
+POST_KEYSET_TYPES = (datetime, int)
+
+# Columns of PostResponseScheme, list endpoints select them directly
+# and encode rows without building ORM objects and pydantic models
+POST_COLUMNS = (
+    Post.title,
+    Post.content,
+    Post.id,
+    Post.category_id,
+    Post.user_id,
+    Post.time_created,
+    Post.time_updated,
+    Post.likes_count,
+)
+
+
+def post_key(post: Row) -> tuple:
+    return post.time_created, post.id
+
+
+def post_row(row: Row) -> dict:
+    post = dict(row._mapping)
+    post["likes_count"] = (post["likes_count"] or 0) + like_counters.pending(post["id"])
+    return post
+
+
+def post_page(rows: Sequence[Row], limit: int) -> dict:
+    result = page(rows, limit, post_key)
+    result["items"] = [post_row(row) for row in result["items"]]
+    return result
+
+
+def post_page_response(result: dict, if_none_match: Optional[str]) -> Response:
+    etag = post_page_etag(result)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(result, headers={"ETag": etag})
+
+
+def post_etag(post_id: int, time_updated, likes_count: Optional[int]) -> str:
+    return make_etag("post", post_id, time_updated, likes_count or 0)
+
+
+def post_page_etag(result: dict) -> str:
+    return make_etag(
+        "posts",
+        result["next_cursor"],
+        *(
+            post_etag(post["id"], post["time_updated"], post["likes_count"])
+            for post in result["items"]
+        ),
+    )
+
 
 @router.post(
     "/create",
@@ -36,14 +103,7 @@ async def create_post(
     db: AsyncSession = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    category = await db.execute(
-        select(Category).where(Category.id == post_scheme.category_id)
-    )
-
-    try:
-        category = category.scalar_one()
-    except NoResultFound:
-        category = None
+    category = await category_cache.get(db, post_scheme.category_id)
 
     if category is None:
         raise HTTPException(
@@ -53,8 +113,10 @@ async def create_post(
 
     post = Post(**post_scheme.dict(), user_id=user.id)
     db.add(post)
+    await add_post_counts(db, user.id, post.category_id, 1)
     await db.commit()
     await db.refresh(post)
+    feed_cache.on_post_created(post)
     return post
 
 
@@ -64,15 +126,26 @@ async def create_post(
     description="""**List of posts**""",
     tags=[Tags.posts],
     status_code=status.HTTP_200_OK,
-    response_model=list[PostResponseScheme],
-    responses={200: post_list.response["200"], 401: post_list.response["401"]},
+    response_model=PostPageScheme,
+    responses={
+        200: post_list.response["200"],
+        400: post_list.response["400"],
+        401: post_list.response["401"],
+    },
 )
 async def list_of_posts(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
-) -> Sequence[Post]:
-    posts_query = await db.execute(select(Post))
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    posts_query = await db.execute(
+        keyset(select(*POST_COLUMNS), POST_KEYSET, POST_KEYSET_TYPES, cursor, limit)
+    )
 
-    return posts_query.scalars().all()
+    result = post_page(posts_query.all(), limit)
+    return post_page_response(result, if_none_match)
 
 
 @router.get(
@@ -81,19 +154,30 @@ async def list_of_posts(
     description="""**Get list of posts that current user liked**""",
     tags=[Tags.posts],
     status_code=status.HTTP_200_OK,
+    response_model=PostPageScheme,
+    responses={
+        200: post_list.response["200"],
+        400: post_list.response["400"],
+        401: post_list.response["401"],
+    },
 )
 async def get_favorite_posts(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
-) -> list:
-    likes_query = await db.execute(
-        select(Like).where(Like.user_id == user.id, Like.liked == True)
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    favorites_query = (
+        select(*POST_COLUMNS).select_from(Post).join(Like, Like.post_id == Post.id)
+    )
+    favorites_query = favorites_query.where(Like.user_id == user.id, Like.liked == True)
+    posts_query = await db.execute(
+        keyset(favorites_query, POST_KEYSET, POST_KEYSET_TYPES, cursor, limit)
     )
-    result = []
-    for like in likes_query.scalars().all():
-        post_query = await db.execute(select(Post).where(Post.id == like.post_id))
-        result.append(post_query.scalar_one())
 
-    return result
+    result = post_page(posts_query.all(), limit)
+    return post_page_response(result, if_none_match)
 
 
 @router.get(
@@ -102,26 +186,164 @@ async def get_favorite_posts(
     description="""**List of post of current user**""",
     tags=[Tags.posts],
     status_code=status.HTTP_200_OK,
-    response_model=list[PostResponseScheme],
-    responses={200: post_list.response["200"], 404: post_list.response["404"]},
+    response_model=PostPageScheme,
+    responses={
+        200: post_list.response["200"],
+        400: post_list.response["400"],
+        404: post_list.response["404"],
+    },
 )
 async def current_user_posts(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
-) -> Sequence[Post]:
-    posts_query = await db.execute(select(Post).where(Post.user_id == user.id))
-
-    try:
-        posts = posts_query.scalars().all()
-    except NoResultFound:
-        posts = None
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    posts_query = await db.execute(
+        keyset(
+            select(*POST_COLUMNS).where(Post.user_id == user.id),
+            POST_KEYSET,
+            POST_KEYSET_TYPES,
+            cursor,
+            limit,
+        )
+    )
+    posts = posts_query.all()
 
-    if posts is None:
+    if not posts and cursor is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="You do not have posts",
         )
 
-    return posts
+    return post_page_response(post_page(posts, limit), if_none_match)
+
+
+@router.get(
+    "/feed",
+    summary="Personalized feed",
+    description="""**Posts from categories current user liked and recent posts**""",
+    tags=[Tags.posts],
+    status_code=status.HTTP_200_OK,
+    response_model=PostPageScheme,
+    responses={
+        200: post_list.response["200"],
+        400: post_list.response["400"],
+        401: post_list.response["401"],
+    },
+)
+async def feed_posts(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+) -> Response:
+    after = decode_cursor(cursor, *POST_KEYSET_TYPES) if cursor is not None else None
+    keys = await feed_cache.page(db, user.id, after, limit + 1)
+
+    next_cursor = None
+    if len(keys) > limit:
+        keys = keys[:limit]
+        next_cursor = encode_cursor(*keys[-1])
+
+    posts = {}
+    if keys:
+        post_ids = [post_id for _, post_id in keys]
+        posts_query = await db.execute(
+            select(*POST_COLUMNS).where(Post.id.in_(post_ids))
+        )
+        posts = {row.id: post_row(row) for row in posts_query.all()}
+
+    return FastJSONResponse(
+        {
+            "items": [posts[post_id] for _, post_id in keys if post_id in posts],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get(
+    "/search",
+    summary="Search posts",
+    description="""**Full-text search over post title and content**""",
+    tags=[Tags.posts],
+    status_code=status.HTTP_200_OK,
+    response_model=PostSearchPageScheme,
+    responses={400: post_list.response["400"], 401: post_list.response["401"]},
+)
+async def search_posts(
+    q: str = Query(min_length=1, max_length=200),
+    category_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+) -> Response:
+    query = func.websearch_to_tsquery(SEARCH_LANGUAGE, q)
+    rank = func.ts_rank_cd(Post.search_vector, query)
+    snippet = func.ts_headline(
+        SEARCH_LANGUAGE, Post.content, query, SEARCH_HEADLINE_OPTIONS
+    )
+
+    search_query = select(
+        *POST_COLUMNS, rank.label("rank"), snippet.label("snippet")
+    ).where(Post.search_vector.op("@@")(query))
+    if category_id is not None:
+        search_query = search_query.where(Post.category_id == category_id)
+
+    posts_query = await db.execute(
+        keyset(search_query, (rank, Post.id), (float, int), cursor, limit)
+    )
+    result = page(posts_query.all(), limit, lambda row: (row.rank, row.id))
+    result["items"] = [post_row(row) for row in result["items"]]
+
+    return FastJSONResponse(result)
+
+
+@router.get(
+    "/trending",
+    summary="Trending posts",
+    description="""**Posts ranked by time-decayed score of recent likes**""",
+    tags=[Tags.posts],
+    status_code=status.HTTP_200_OK,
+    response_model=list[PostResponseScheme],
+    responses={401: post_list.response["401"]},
+)
+async def trending_posts(
+    category_id: Optional[int] = None,
+    limit: int = Query(default=TRENDING_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(default=0, ge=0, lt=TRENDING_TOP_K),
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+) -> Response:
+    post_ids = trending.top(category_id, limit, offset)
+    if not post_ids:
+        return FastJSONResponse([])
+
+    posts_query = await db.execute(select(*POST_COLUMNS).where(Post.id.in_(post_ids)))
+    posts = {row.id: post_row(row) for row in posts_query.all()}
+
+    return FastJSONResponse(
+        [posts[post_id] for post_id in post_ids if post_id in posts]
+    )
+
+
+@router.get(
+    "/export",
+    summary="Export posts",
+    description="""**Stream all posts as NDJSON or CSV**""",
+    tags=[Tags.posts],
+    status_code=status.HTTP_200_OK,
+    responses={401: post_list.response["401"]},
+)
+async def export_posts(
+    format: ExportFormat = ExportFormat.ndjson,
+    db: AsyncSession = Depends(get_read_db),
+    is_admin: bool = Depends(is_admin_user),
+) -> Response:
+    query = select(*POST_COLUMNS).order_by(Post.id)
+    return export_response(db, query, format, "posts")
 
 
 @router.get(
@@ -139,21 +361,39 @@ async def current_user_posts(
 )
 async def get_post(
     post_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(default=None),
 ) -> PostResponseScheme:
+    post_not_found = HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Post was not found"
+    )
+
+    if if_none_match:
+        # Check version columns first, so content is not loaded for 304
+        version_query = await db.execute(
+            select(Post.time_updated, Post.likes_count).where(Post.id == post_id)
+        )
+        version = version_query.first()
+        if version is None:
+            raise post_not_found
+
+        time_updated, likes_count = version
+        likes_count = (likes_count or 0) + like_counters.pending(post_id)
+        etag = post_etag(post_id, time_updated, likes_count)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
     post_query = await db.execute(select(Post).where(Post.id == post_id))
 
     try:
         post = post_query.scalar_one()
     except NoResultFound:
-        post = None
-
-    if post is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Post was not found"
-        )
+        raise post_not_found
 
+    post = with_pending_likes(post)
+    response.headers["ETag"] = post_etag(post.id, post.time_updated, post.likes_count)
     return post
 
 
@@ -192,18 +432,18 @@ async def update_post(
             detail="You are not an owner of this post",
         )
 
-    category_query = await db.execute(
-        select(Category).where(Category.id == post_scheme.category_id)
-    )
+    category = await category_cache.get(db, post_scheme.category_id)
 
-    try:
-        category = category_query.scalar_one()
-    except NoResultFound:
+    if category is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No such category with id {post_scheme.category_id}",
         )
 
+    if post.category_id != post_scheme.category_id:
+        await add_post_counts(db, user.id, post.category_id, -1)
+        await add_post_counts(db, user.id, post_scheme.category_id, 1)
+
     post.title = post_scheme.title
     post.content = post_scheme.content
     post.category_id = post_scheme.category_id
@@ -211,7 +451,7 @@ async def update_post(
     await db.commit()
     await db.refresh(post)
 
-    return post
+    return with_pending_likes(post)
 
 
 @router.delete(
@@ -242,5 +482,9 @@ async def delete_post(
             detail="You are not an owner of this post",
         )
 
+    likes_count = (post.likes_count or 0) + like_counters.pending(post_id)
+    await add_post_counts(db, user.id, post.category_id, -1)
+    await add_likes_received(db, user.id, -likes_count)
     await db.delete(post)
     await db.commit()
+    trending.discard(post_id)
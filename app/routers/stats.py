@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func, select
+from ..tags import Tags
+from ..databases import AsyncSession
+from ..dependencies import get_read_db
+from ..models.categories import Category
+from ..models.stats import CategoryStats, UserStats
+from ..models.users import User
+from ..schemas.stats import CategoryStatsScheme, UserStatsScheme
+from ..utils import get_current_user
+from ..counters import like_counters
+
+router = APIRouter(prefix="/api/stats")
+
+
+def category_stats_query():
+    return select(
+        Category.id.label("category_id"),
+        Category.title,
+        func.coalesce(CategoryStats.posts_count, 0).label("posts_count"),
+    ).outerjoin(CategoryStats, CategoryStats.category_id == Category.id)
+
+
+async def get_user_stats(db: AsyncSession, user_id: int) -> UserStatsScheme:
+    stats_query = await db.execute(
+        select(UserStats).where(UserStats.user_id == user_id)
+    )
+    stats = stats_query.scalar_one_or_none()
+
+    if stats is None:
+        stats = UserStatsScheme(user_id=user_id)
+    else:
+        stats = UserStatsScheme.from_orm(stats)
+    # Likes buffered in write-behind mode
+    stats.likes_received += like_counters.pending_received(user_id)
+    return stats
+
+
+@router.get(
+    "/categories",
+    summary="Category stats",
+    description="""**Number of posts per category**""",
+    tags=[Tags.stats],
+    status_code=status.HTTP_200_OK,
+    response_model=list[CategoryStatsScheme],
+)
+async def categories_stats(
+    db: AsyncSession = Depends(get_read_db), user: User = Depends(get_current_user)
+):
+    stats_query = await db.execute(category_stats_query().order_by(Category.id))
+    return stats_query.all()
+
+
+@router.get(
+    "/categories/{category_id}",
+    summary="Stats of category",
+    description="""**Number of posts in category by _id_**""",
+    tags=[Tags.stats],
+    status_code=status.HTTP_200_OK,
+    response_model=CategoryStatsScheme,
+)
+async def category_stats(
+    category_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    stats_query = await db.execute(
+        category_stats_query().where(Category.id == category_id)
+    )
+    stats = stats_query.first()
+
+    if stats is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Category was not found"
+        )
+    return stats
+
+
+@router.get(
+    "/users/me",
+    summary="Stats of current user",
+    description="""**Posts written and likes received by current user**""",
+    tags=[Tags.stats],
+    status_code=status.HTTP_200_OK,
+    response_model=UserStatsScheme,
+)
+async def current_user_stats(
+    db: AsyncSession = Depends(get_read_db), user: User = Depends(get_current_user)
+):
+    return await get_user_stats(db, user.id)
+
+
+@router.get(
+    "/users/{user_id}",
+    summary="Stats of user",
+    description="""**Posts written and likes received by user _id_**""",
+    tags=[Tags.stats],
+    status_code=status.HTTP_200_OK,
+    response_model=UserStatsScheme,
+)
+async def user_stats(
+    user_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    return await get_user_stats(db, user_id)
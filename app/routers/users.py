@@ -1,10 +1,11 @@
 from ..tags import Tags
 from ..models.users import User
-from ..dependencies import get_db
-from ..utils import get_current_user
+from ..dependencies import get_db, get_read_db
+from ..utils import get_current_user, is_admin_user
 from ..databases import AsyncSession
 from ..schemas.users import UserScheme, UserInDBScheme
 from ..utils import hashed_password, verify_password, create_access_token
+from ..utils import revoke_user_tokens
 from ..Responses.users import (
     register_responses,
     login_responses,
@@ -13,9 +14,11 @@ from ..Responses.users import (
 from sqlalchemy import select
 from sqlalchemy.exc import NoResultFound
 from fastapi import status
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from ..settings import config_env
+from ..serialization import FastJSONResponse, rows_to_dicts
+from ..exports import ExportFormat, export_response
 
 router = APIRouter(prefix="/api/users")
 
@@ -41,7 +44,9 @@ async def create_user(
             detail="User with this email already exists",
         )
 
-    user = User(email=user_scheme.email, password=hashed_password(user_scheme.password))
+    user = User(
+        email=user_scheme.email, password=await hashed_password(user_scheme.password)
+    )
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -81,10 +86,10 @@ async def login_user(
 
     hashed_password = user.password
 
-    if not verify_password(form_data.password, hashed_password):
+    if not await verify_password(form_data.password, hashed_password):
         raise credentials_exception
 
-    access_token = create_access_token(user.email)
+    access_token = create_access_token(user)
 
     return {"access_token": access_token}
 
@@ -105,6 +110,20 @@ async def current_user(user: User = Depends(get_current_user)):
     return user
 
 
+@router.post(
+    "/logout-all",
+    summary="Logout from all devices",
+    description="""**Revoke all access tokens of current user**""",
+    tags=[Tags.users],
+    status_code=status.HTTP_200_OK,
+)
+async def logout_all(
+    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
+) -> dict:
+    await revoke_user_tokens(db, user.id)
+    return {"message": "All tokens were revoked"}
+
+
 @router.post(
     "/create-admin",
     summary="Create an admin user",
@@ -129,7 +148,7 @@ async def create_admin_user(
 
     user = User(
         email=user_scheme.email,
-        password=hashed_password(user_scheme.password),
+        password=await hashed_password(user_scheme.password),
         is_admin=True,
     )
 
@@ -144,6 +163,22 @@ async def create_admin_user(
 
 
 @router.get("/list", response_model=list[UserScheme])
-async def users_list(db: AsyncSession = Depends(get_db)):
-    users = await db.execute(select(User))
-    return users.scalars().all()
+async def users_list(db: AsyncSession = Depends(get_read_db)):
+    users = await db.execute(select(User.email))
+    return FastJSONResponse(rows_to_dicts(users.all()))
+
+
+@router.get(
+    "/export",
+    summary="Export users",
+    description="""**Stream all users as NDJSON or CSV**""",
+    tags=[Tags.users],
+    status_code=status.HTTP_200_OK,
+)
+async def export_users(
+    format: ExportFormat = ExportFormat.ndjson,
+    db: AsyncSession = Depends(get_read_db),
+    is_admin: bool = Depends(is_admin_user),
+) -> Response:
+    query = select(User.id, User.email, User.is_admin).order_by(User.id)
+    return export_response(db, query, format, "users")
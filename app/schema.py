@@ -0,0 +1,27 @@
+from pathlib import Path
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+
+def head_revision() -> str:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+async def verify_schema(conn: AsyncConnection) -> None:
+    """Fail startup unless the database is migrated to the latest revision"""
+    current = await conn.run_sync(
+        lambda sync_conn: MigrationContext.configure(sync_conn).get_current_revision()
+    )
+    head = head_revision()
+
+    if current != head:
+        raise RuntimeError(
+            f"Database schema revision is {current}, expected {head}. "
+            "Run 'alembic upgrade head'"
+        )
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -11,3 +12,8 @@ class CategoryResponseScheme(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class CategoryPageScheme(BaseModel):
+    items: list[CategoryResponseScheme]
+    next_cursor: Optional[str] = None
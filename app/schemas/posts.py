@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
 
 
@@ -21,3 +22,18 @@ class PostResponseScheme(PostScheme):
 
     class Config:
         orm_mode = True
+
+
+class PostPageScheme(BaseModel):
+    items: list[PostResponseScheme]
+    next_cursor: Optional[str] = None
+
+
+class PostSearchResultScheme(PostResponseScheme):
+    rank: float
+    snippet: str
+
+
+class PostSearchPageScheme(BaseModel):
+    items: list[PostSearchResultScheme]
+    next_cursor: Optional[str] = None
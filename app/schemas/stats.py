@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+
+
+class CategoryStatsScheme(BaseModel):
+    category_id: int
+    title: str
+    posts_count: int
+
+    class Config:
+        orm_mode = True
+
+
+class UserStatsScheme(BaseModel):
+    user_id: int
+    posts_count: int = 0
+    likes_received: int = 0
+
+    class Config:
+        orm_mode = True
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 
@@ -10,3 +11,8 @@ class UserScheme(BaseModel):
 
 class UserInDBScheme(UserScheme):
     password: str
+
+
+class CurrentUserScheme(UserScheme):
+    id: int
+    is_admin: Optional[bool] = False
@@ -0,0 +1,37 @@
+import json
+from datetime import date, datetime
+from typing import Any, Iterable
+from fastapi import Response
+from sqlalchemy import Row
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content with orjson when available, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response for pre-built dicts, skips response_model validation"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_to_dicts(rows: Iterable[Row]) -> list[dict]:
+    """Convert Core result rows to dicts keyed by column label"""
+    return [dict(row._mapping) for row in rows]
@@ -0,0 +1,53 @@
+"""Production entry point: python -m app.serve [--workers N]"""
+import argparse
+import importlib.util
+import os
+import uvicorn
+from .settings import (
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+    SERVER_BACKLOG,
+    SERVER_KEEPALIVE_SECONDS,
+    SERVER_LIMIT_CONCURRENCY,
+)
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def serve(
+    host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS
+) -> None:
+    """Run uvicorn workers, each with its own event loop and database pool
+
+    On SIGTERM uvicorn stops accepting connections, waits for in-flight
+    requests and then runs the app shutdown handler, which disposes the pools.
+    """
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers or os.cpu_count() or 1,
+        loop="uvloop" if _available("uvloop") else "asyncio",
+        http="httptools" if _available("httptools") else "h11",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEPALIVE_SECONDS,
+        limit_concurrency=SERVER_LIMIT_CONCURRENCY or None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API with uvicorn")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument(
+        "--workers", type=int, default=SERVER_WORKERS, help="0 uses CPU count"
+    )
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,98 @@
+import os
 from dotenv import dotenv_values
 
+config_env = {
+    **dotenv_values(".env"),
+    **os.environ,
+}
+
+
+def env_bool(name: str, default: bool) -> bool:
+    return str(config_env.get(name, default)).lower() in ("1", "true", "yes")
+
+
 INIT_TABLES = False
+# "verify" checks migration revision on startup, "create" runs create_all
+SCHEMA_MODE = config_env.get("SCHEMA_MODE", "verify")
 DEBUG = True
 ACCESS_TOKEN_EXPIRE_MINUTES = 240
 ALGORITHM = "HS256"
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Other workers accept revoked tokens until their cached version expires,
+# 0 checks the database on every request
+TOKEN_VERSION_CACHE_TTL_SECONDS = float(
+    config_env.get("TOKEN_VERSION_CACHE_TTL_SECONDS", 60)
+)
+TOKEN_VERSION_CACHE_MAX_SIZE = 10000
+# Verified token payloads, entries never outlive the token exp claim
+TOKEN_CACHE_TTL_SECONDS = 300
+TOKEN_CACHE_MAX_SIZE = 10000
+# Other workers see category changes after at most this long,
+# 0 checks the stored version on every request
+CATEGORY_CACHE_STALE_SECONDS = float(config_env.get("CATEGORY_CACHE_STALE_SECONDS", 5))
+PASSWORD_HASH_WORKERS = 4
+PASSWORD_HASH_MAX_QUEUE = 64
+# Buffer likes_count updates in memory and flush them periodically
+LIKES_WRITE_BEHIND = False
+LIKES_FLUSH_INTERVAL_SECONDS = 1.0
+LIKES_FLUSH_MAX_PENDING = 1000
+# Recompute posts.likes_count from likes, interval 0 disables the schedule
+RECONCILE_ON_STARTUP = False
+RECONCILE_INTERVAL_SECONDS = 0
+RECONCILE_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 1000
+# Trending posts: score of a like halves every TRENDING_HALF_LIFE_SECONDS
+TRENDING_HALF_LIFE_SECONDS = 6 * 3600
+TRENDING_TOP_K = 200
+TRENDING_PAGE_SIZE = 20
+TRENDING_REFRESH_SECONDS = 60
+# Personalized feed cache, sizes are numbers of post keys
+FEED_CACHE_USERS = 10000
+FEED_CACHE_SIZE = 500
+FEED_RECENT_SIZE = 200
+FEED_CACHE_TTL_SECONDS = 300
+# Text search configuration of posts.search_vector
+SEARCH_LANGUAGE = "english"
+SEARCH_HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
 
-config_env = {
-    **dotenv_values(".env"),
-}
+# app.serve: 0 workers runs one per CPU, 0 concurrency limit means unlimited
+SERVER_HOST = config_env.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(config_env.get("SERVER_PORT", 8000))
+SERVER_WORKERS = int(config_env.get("SERVER_WORKERS", 0))
+SERVER_BACKLOG = int(config_env.get("SERVER_BACKLOG", 2048))
+SERVER_KEEPALIVE_SECONDS = int(config_env.get("SERVER_KEEPALIVE_SECONDS", 5))
+SERVER_LIMIT_CONCURRENCY = int(config_env.get("SERVER_LIMIT_CONCURRENCY", 0))
+
+# Database connection, pool and driver settings (overridable from env)
+POSTGRES_HOST = config_env.get("POSTGRES_HOST", "localhost")
+POSTGRES_PORT = int(config_env.get("POSTGRES_PORT", 5432))
+DB_POOL_SIZE = int(config_env.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(config_env.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(config_env.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(config_env.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+# Set to 0 when running behind PgBouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(config_env.get("DB_STATEMENT_CACHE_SIZE", 100))
+DB_COMMAND_TIMEOUT = float(config_env.get("DB_COMMAND_TIMEOUT", 60))
+# Server-side timeouts, 0 keeps server defaults
+DB_STATEMENT_TIMEOUT_MS = int(config_env.get("DB_STATEMENT_TIMEOUT_MS", 0))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(
+    config_env.get("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", 0)
+)
+DB_SLOW_CHECKOUT_MS = int(config_env.get("DB_SLOW_CHECKOUT_MS", 100))
+# Open DB_POOL_SIZE connections and run hot lookups on startup, see /api/health/ready
+WARMUP_ON_STARTUP = env_bool("WARMUP_ON_STARTUP", True)
+# Log statements slower than this with parameters redacted, 0 disables
+SLOW_QUERY_MS = int(config_env.get("SLOW_QUERY_MS", 200))
+# DEBUG: warn when one request runs the same statement more than this many times
+N_PLUS_ONE_THRESHOLD = int(config_env.get("N_PLUS_ONE_THRESHOLD", 5))
+# Add X-DB-Queries / X-DB-Time headers to responses, they reveal timing to clients
+DB_STATS_HEADERS = env_bool("DB_STATS_HEADERS", False)
+# Read replica for GET routes, unset host sends reads to the primary
+POSTGRES_REPLICA_HOST = config_env.get("POSTGRES_REPLICA_HOST")
+POSTGRES_REPLICA_PORT = int(config_env.get("POSTGRES_REPLICA_PORT", POSTGRES_PORT))
+# Caller reads from primary for this long after a write
+READ_YOUR_WRITES_SECONDS = float(config_env.get("READ_YOUR_WRITES_SECONDS", 5))
+# Skip replica for this long after it failed to connect
+REPLICA_RETRY_SECONDS = float(config_env.get("REPLICA_RETRY_SECONDS", 30))
@@ -0,0 +1,104 @@
+import asyncio
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from .databases import AsyncSession, SessionLocal
+from .models.categories import Category
+from .models.likes import Like
+from .models.posts import Post
+from .models.stats import CategoryStats, UserStats
+from .models.users import User
+
+# Counters are changed in the caller's transaction, so they commit or roll
+# back together with the post or like they describe
+
+
+async def add_post_counts(
+    db: AsyncSession, user_id: int, category_id: int, delta: int
+) -> None:
+    await db.execute(
+        insert(CategoryStats)
+        .values(category_id=category_id, posts_count=delta)
+        .on_conflict_do_update(
+            index_elements=[CategoryStats.category_id],
+            set_={"posts_count": CategoryStats.posts_count + delta},
+        )
+    )
+    await db.execute(
+        insert(UserStats)
+        .values(user_id=user_id, posts_count=delta)
+        .on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={"posts_count": UserStats.posts_count + delta},
+        )
+    )
+
+
+async def add_likes_received(db: AsyncSession, user_id: int, delta: int) -> None:
+    await db.execute(
+        insert(UserStats)
+        .values(user_id=user_id, likes_received=delta)
+        .on_conflict_do_update(
+            index_elements=[UserStats.user_id],
+            set_={"likes_received": UserStats.likes_received + delta},
+        )
+    )
+
+
+async def rebuild_stats() -> None:
+    """Recompute all aggregate tables from posts and likes"""
+    category_counts = (
+        select(Category.id, func.count(Post.id))
+        .outerjoin(Post, Post.category_id == Category.id)
+        .group_by(Category.id)
+    )
+    user_posts = (
+        select(Post.user_id, func.count(Post.id).label("count"))
+        .group_by(Post.user_id)
+        .subquery()
+    )
+    user_likes = (
+        select(Post.user_id, func.count(Like.id).label("count"))
+        .join(Like, Like.post_id == Post.id)
+        .where(Like.liked == True)
+        .group_by(Post.user_id)
+        .subquery()
+    )
+    user_counts = (
+        select(
+            User.id,
+            func.coalesce(user_posts.c.count, 0),
+            func.coalesce(user_likes.c.count, 0),
+        )
+        .outerjoin(user_posts, user_posts.c.user_id == User.id)
+        .outerjoin(user_likes, user_likes.c.user_id == User.id)
+    )
+
+    async with SessionLocal() as session:
+        category_insert = insert(CategoryStats).from_select(
+            ["category_id", "posts_count"], category_counts
+        )
+        await session.execute(
+            category_insert.on_conflict_do_update(
+                index_elements=[CategoryStats.category_id],
+                set_={"posts_count": category_insert.excluded.posts_count},
+            )
+        )
+
+        user_insert = insert(UserStats).from_select(
+            ["user_id", "posts_count", "likes_received"], user_counts
+        )
+        await session.execute(
+            user_insert.on_conflict_do_update(
+                index_elements=[UserStats.user_id],
+                set_={
+                    "posts_count": user_insert.excluded.posts_count,
+                    "likes_received": user_insert.excluded.likes_received,
+                },
+            )
+        )
+        await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(rebuild_stats())
+    print("Stats rebuilt")
@@ -6,3 +6,5 @@ class Tags(Enum):
     categories = "Categories"
     posts = "Posts"
     likes = "Likes"
+    stats = "Stats"
+    health = "Health"
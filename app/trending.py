@@ -0,0 +1,178 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import timedelta
+from itertools import chain
+from typing import Optional
+from sqlalchemy import func, select
+from .databases import SessionLocal
+from .models.posts import Post
+from .settings import (
+    TRENDING_HALF_LIFE_SECONDS,
+    TRENDING_TOP_K,
+    TRENDING_REFRESH_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def trending_score_values(delta) -> dict:
+    """Column values that decay the stored score to now() and add delta"""
+    elapsed = func.extract(
+        "epoch", func.now() - func.coalesce(Post.trending_updated, func.now())
+    )
+    decayed = func.coalesce(Post.trending_score, 0) * func.power(
+        2.0, -elapsed / TRENDING_HALF_LIFE_SECONDS
+    )
+    return {
+        "trending_score": func.greatest(decayed + delta, 0),
+        "trending_updated": func.now(),
+    }
+
+
+class TrendingIndex:
+    """Top-K posts per category by time-decayed like score
+
+    A score of s stored at time t is worth s * 2 ** ((t - now) / half_life).
+    """
+
+    def __init__(self, half_life: float, top_k: int, refresh_interval: float):
+        self.half_life = half_life
+        self.top_k = top_k
+        self.refresh_interval = refresh_interval
+        self._categories: dict[int, dict[int, tuple[float, float]]] = {}
+        self._post_categories: dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 2 ** ((updated - now) / self.half_life)
+
+    def set(self, post_id: int, category_id: int, score: float, updated: float):
+        """Store score persisted at updated (unix time)"""
+        if self._post_categories.get(post_id, category_id) != category_id:
+            self.discard(post_id)
+
+        entries = self._categories.setdefault(category_id, {})
+        entries[post_id] = (score, updated)
+        self._post_categories[post_id] = category_id
+
+        if len(entries) > 2 * self.top_k:
+            self._prune(entries)
+
+    def add(self, post_id: int, category_id: int, delta: float) -> None:
+        """Apply like delta to in-memory score"""
+        now = time.time()
+        score, updated = self._categories.get(category_id, {}).get(post_id, (0, now))
+        score = max(self._decayed(score, updated, now) + delta, 0.0)
+        self.set(post_id, category_id, score, now)
+
+    def discard(self, post_id: int) -> None:
+        category_id = self._post_categories.pop(post_id, None)
+        if category_id is not None:
+            self._categories.get(category_id, {}).pop(post_id, None)
+
+    def _prune(self, entries: dict) -> None:
+        now = time.time()
+        ranked = sorted(
+            entries, key=lambda post_id: self._decayed(*entries[post_id], now)
+        )
+        for post_id in ranked[: len(entries) - self.top_k]:
+            del entries[post_id]
+            self._post_categories.pop(post_id, None)
+
+    def top(self, category_id: Optional[int], limit: int, offset: int = 0) -> list:
+        """Post ids ranked by current decayed score"""
+        now = time.time()
+        if category_id is None:
+            entries = chain.from_iterable(
+                entries.items() for entries in self._categories.values()
+            )
+        else:
+            entries = self._categories.get(category_id, {}).items()
+
+        ranked = heapq.nlargest(
+            offset + limit, entries, key=lambda item: self._decayed(*item[1], now)
+        )
+        return [post_id for post_id, _ in ranked[offset:]]
+
+    async def load(self) -> None:
+        """Rebuild index from persisted scores, top_k per category"""
+        elapsed = func.extract("epoch", func.now() - Post.trending_updated)
+        decayed = Post.trending_score * func.power(2.0, -elapsed / self.half_life)
+        ranked = (
+            select(
+                Post.id,
+                Post.category_id,
+                Post.trending_score,
+                Post.trending_updated,
+                func.row_number()
+                .over(partition_by=Post.category_id, order_by=decayed.desc())
+                .label("rank"),
+            )
+            .where(
+                Post.trending_updated
+                > func.now() - timedelta(seconds=self.half_life * 10),
+                Post.trending_score > 0,
+            )
+            .subquery()
+        )
+
+        # Imported here, app.counters imports this module
+        from .counters import like_counters
+
+        # Flushes are paused so buffered likes are either in the loaded scores
+        # or still pending, never both or neither
+        async with like_counters.paused():
+            async with SessionLocal() as session:
+                rows = await session.execute(
+                    select(ranked).where(ranked.c.rank <= self.top_k)
+                )
+
+            categories: dict[int, dict[int, tuple[float, float]]] = {}
+            post_categories = {}
+            for post_id, category_id, score, updated, _ in rows:
+                categories.setdefault(category_id, {})[post_id] = (
+                    score,
+                    updated.timestamp(),
+                )
+                post_categories[post_id] = category_id
+
+            # Likes buffered in this worker are not in trending_score yet
+            now = time.time()
+            for post_id, category_id in self._post_categories.items():
+                delta = like_counters.pending(post_id)
+                if not delta:
+                    continue
+                entries = categories.setdefault(category_id, {})
+                score, updated = entries.get(post_id, (0.0, now))
+                score = max(self._decayed(score, updated, now) + delta, 0.0)
+                entries[post_id] = (score, now)
+                post_categories[post_id] = category_id
+
+            self._categories = categories
+            self._post_categories = post_categories
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.load()
+            except Exception:
+                logger.exception("Failed to load trending scores")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+trending = TrendingIndex(
+    half_life=TRENDING_HALF_LIFE_SECONDS,
+    top_k=TRENDING_TOP_K,
+    refresh_interval=TRENDING_REFRESH_SECONDS,
+)
@@ -1,13 +1,21 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Union, Any
+from typing import Callable, Optional, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.exc import NoResultFound
 from .databases import AsyncSession
 from .models.users import User
-from .schemas.users import UserScheme
+from .schemas.users import CurrentUserScheme
 from .settings import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM
+from .settings import TOKEN_VERSION_CACHE_TTL_SECONDS, TOKEN_VERSION_CACHE_MAX_SIZE
+from .settings import TOKEN_CACHE_TTL_SECONDS, TOKEN_CACHE_MAX_SIZE
+from .settings import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+from .cache import TTLCache
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from .settings import config_env
@@ -18,16 +26,86 @@ JWT_SECRET_KEY = config_env.get("JWT_SECRET_KEY")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/users/login", scheme_name="JWT")
 
+# Current users.token_version keyed by user id, tokens with another version
+# are revoked
+token_versions = TTLCache(
+    max_size=TOKEN_VERSION_CACHE_MAX_SIZE, ttl=TOKEN_VERSION_CACHE_TTL_SECONDS
+)
 
-def hashed_password(password: str) -> str:
-    return pwd_context.hash(password)
+# Verified token payloads keyed by token digest
+decoded_tokens = TTLCache(max_size=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL_SECONDS)
 
 
-def verify_password(password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(password, hashed_password)
+# bcrypt releases the GIL, so hashing runs in threads without blocking the loop
+password_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password"
+)
+_password_tasks = 0
 
 
-def create_access_token(subject: Union[str, Any], expires_delta: int = None) -> str:
+async def _run_password_task(func: Callable, *args: Any) -> Any:
+    """Run bcrypt work in password_executor, reject with 503 when saturated"""
+    global _password_tasks
+
+    if _password_tasks >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+    _password_tasks += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        _password_tasks -= 1
+
+
+async def hashed_password(password: str) -> str:
+    return await _run_password_task(pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _run_password_task(pwd_context.verify, password, hashed_password)
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int) -> None:
+    """Invalidate all issued tokens of the user
+
+    Must be called whenever claims stored in tokens change (e.g. is_admin).
+    Only this worker's cache is cleared, other workers keep accepting the old
+    tokens for up to TOKEN_VERSION_CACHE_TTL_SECONDS.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    token_versions.invalidate(user_id)
+
+
+async def get_token_version(db: AsyncSession, user_id: int) -> Optional[int]:
+    """Return users.token_version through token_versions cache, None if no user"""
+    version = token_versions.get(user_id)
+    if version is not None:
+        return version
+
+    version_query = await db.execute(
+        select(User.token_version).where(User.id == user_id)
+    )
+    try:
+        version = version_query.scalar_one()
+    except NoResultFound:
+        return None
+
+    token_versions.set(user_id, version)
+    return version
+
+
+def create_access_token(user: User, expires_delta: timedelta = None) -> str:
     if expires_delta is not None:
         expires_delta = datetime.utcnow() + expires_delta
     else:
@@ -35,17 +113,47 @@ def create_access_token(subject: Union[str, Any], expires_delta: int = None) ->
             minutes=ACCESS_TOKEN_EXPIRE_MINUTES
         )
 
-    to_encode = {"exp": expires_delta, "sub": str(subject)}
+    to_encode = {
+        "exp": expires_delta,
+        "sub": str(user.email),
+        "uid": user.id,
+        "adm": bool(user.is_admin),
+        "ver": user.token_version or 0,
+    }
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, ALGORITHM)
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """Verify token through decoded_tokens cache, raises JWTError"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = decoded_tokens.get(key)
+    if payload is not None:
+        return payload
+
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
+    expires_at = payload.get("exp")
+    if expires_at is None:
+        # jose only checks exp when present, tokens we issue always have it
+        raise JWTError("Token has no expiration")
+
+    ttl = min(decoded_tokens.ttl, expires_at - time.time())
+    if ttl > 0:
+        decoded_tokens.set(key, payload, ttl=ttl)
+    return payload
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-) -> UserScheme:
+) -> CurrentUserScheme:
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
     try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
-        username = payload.get("sub")
+        payload = decode_access_token(token)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,24 +161,22 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await db.execute(select(User).where(User.email == username))
-    try:
-        user = user.scalar_one()
-    except NoResultFound:
-        user = None
+    user_id = payload.get("uid")
+    if user_id is None:
+        raise credentials_exception
 
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    if await get_token_version(db, user_id) != payload.get("ver"):
+        raise credentials_exception
 
-    return user
+    # Claims are signed by us, skip pydantic validation
+    return CurrentUserScheme.construct(
+        id=user_id, email=payload.get("sub"), is_admin=payload.get("adm", False)
+    )
 
 
 async def is_admin_user(
-    db: AsyncSession = Depends(get_db), user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    user: CurrentUserScheme = Depends(get_current_user),
 ) -> bool:
     if not user.is_admin:
         raise HTTPException(
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from .counters import like_counters
+from .databases import AsyncSession, engine, read_engine, SessionLocal
+from .models.categories import Category
+from .models.posts import Post
+from .models.users import User
+from .routers.likes import count_toggled, select_toggled, toggle_like
+from .settings import DB_POOL_SIZE, WARMUP_ON_STARTUP
+from .stats import add_likes_received
+
+logger = logging.getLogger(__name__)
+
+# Same statements as login, authentication, post/category lookups and the like
+# route, so compiled SQL and asyncpg prepared statements are reused by the first
+# real requests. Parameters match no rows.
+HOT_STATEMENTS = (
+    select(User).where(User.email == ""),
+    select(User.token_version).where(User.id == 0),
+    select(Post).where(Post.id == 0),
+    select(Post.time_updated, Post.likes_count).where(Post.id == 0),
+    select(Post.user_id, Post.category_id).where(Post.id == 0),
+    select(Category).where(Category.id == 0),
+)
+
+
+def like_writes() -> list[Callable[[AsyncSession], Awaitable]]:
+    """Writes of add_like in the current counter mode, each taking a session"""
+    toggled = toggle_like(0, 0)
+    if like_counters.enabled:
+        return [lambda session: session.execute(select_toggled(toggled))]
+    return [
+        lambda session: session.execute(count_toggled(toggled)),
+        lambda session: add_likes_received(session, 0, 1),
+    ]
+
+
+async def warm_engine(async_engine: AsyncEngine, size: int, writes: bool = True):
+    """Open size connections at once and run the hot statements on each"""
+    results = await asyncio.gather(
+        *(async_engine.connect() for _ in range(size)), return_exceptions=True
+    )
+    connections = [result for result in results if not isinstance(result, Exception)]
+    try:
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        async def warm(connection) -> None:
+            # Prepared statements are per connection, so every one runs them all
+            async with SessionLocal(bind=connection) as session:
+                for statement in HOT_STATEMENTS:
+                    await session.execute(statement)
+                # Post and user 0 don't exist, so the writes fail on foreign keys
+                # after being prepared. Nothing is kept either way.
+                for write in like_writes() if writes else ():
+                    try:
+                        await write(session)
+                    except DBAPIError:
+                        pass
+                    await session.rollback()
+
+        await asyncio.gather(*(warm(connection) for connection in connections))
+    finally:
+        # Connections go back to the pool and stay open for the first requests
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+
+class WarmUp:
+    """Background pool warm-up, ready is set once it finished"""
+
+    def __init__(self, enabled: bool, size: int):
+        self.enabled = enabled
+        self.size = size
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        try:
+            await warm_engine(engine, self.size)
+            if read_engine is not None:
+                await warm_engine(read_engine, self.size, writes=False)
+            logger.info("Warmed up %s connections per engine", self.size)
+        except Exception:
+            # Warm-up only saves latency, requests can still be served without it
+            logger.exception("Connection pool warm-up failed")
+        self.ready = True
+
+    def start(self) -> None:
+        if not self.enabled:
+            self.ready = True
+        elif self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+warmup = WarmUp(enabled=WARMUP_ON_STARTUP, size=DB_POOL_SIZE)
@@ -0,0 +1,264 @@
+"""Drive API endpoints at fixed request rates and report latency percentiles
+
+Requests are scheduled open-loop: request i of an endpoint starts at i / rate
+seconds whether or not earlier ones finished, and latency is measured from the
+scheduled time, so a slow server cannot hide its queueing delay.
+
+Run against a server seeded with benchmarks.seed:
+    python -m benchmarks.loadtest --rate 50 --duration 20 --output report.json
+    python -m benchmarks.loadtest --baseline report.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+import httpx
+
+
+class Dataset:
+    """Request inputs drawn from the manifest written by benchmarks.seed"""
+
+    def __init__(self, manifest: dict, tokens: list, rng: random.Random):
+        self.manifest = manifest
+        self.tokens = tokens
+        self.rng = rng
+        posts = manifest["posts"]
+        weights = (1 / rank ** manifest["zipf"] for rank in range(1, len(posts) + 1))
+        self._post_weights = list(itertools.accumulate(weights))
+
+    def user(self) -> tuple[int, str]:
+        """Index and token of a logged in user"""
+        index = self.rng.randrange(len(self.tokens))
+        return index, self.tokens[index]
+
+    def popular_post(self) -> list:
+        """[post_id, owner_id] drawn with the same skew as seeded likes"""
+        posts = self.manifest["posts"]
+        return self.rng.choices(posts, cum_weights=self._post_weights)[0]
+
+    def category_id(self) -> int:
+        return self.rng.choice(self.manifest["category_ids"])
+
+
+class Request(NamedTuple):
+    method: str
+    url: str
+    token: Optional[str] = None
+    data: Optional[dict] = None
+
+
+def login(dataset: Dataset) -> Request:
+    index, _ = dataset.user()
+    form = {
+        "username": dataset.manifest["emails"][index],
+        "password": dataset.manifest["password"],
+    }
+    return Request("POST", "/api/users/login", data=form)
+
+
+def like_post(dataset: Dataset) -> Request:
+    index, token = dataset.user()
+    user_id = dataset.manifest["user_ids"][index]
+    post_id, owner_id = dataset.popular_post()
+    while owner_id == user_id:
+        post_id, owner_id = dataset.popular_post()
+    return Request("POST", f"/api/likes/add/{post_id}", token)
+
+
+ENDPOINTS: dict[str, Callable[[Dataset], Request]] = {
+    "users.login": login,
+    "users.me": lambda d: Request("GET", "/api/users/me", d.user()[1]),
+    "categories.list": lambda d: Request("GET", "/api/categories/list", d.user()[1]),
+    "categories.get": lambda d: Request(
+        "GET", f"/api/categories/{d.category_id()}", d.user()[1]
+    ),
+    "posts.list": lambda d: Request("GET", "/api/posts/list", d.user()[1]),
+    "posts.get": lambda d: Request(
+        "GET", f"/api/posts/{d.popular_post()[0]}", d.user()[1]
+    ),
+    "posts.feed": lambda d: Request("GET", "/api/posts/feed", d.user()[1]),
+    "posts.trending": lambda d: Request("GET", "/api/posts/trending", d.user()[1]),
+    "posts.search": lambda d: Request(
+        "GET", "/api/posts/search?q=postgres+async", d.user()[1]
+    ),
+    "likes.add": like_post,
+}
+
+
+def percentile(sorted_values: list, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return None
+    index = max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+async def send(client: httpx.AsyncClient, request: Request) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {request.token}"} if request.token else {}
+    return await client.request(
+        request.method, request.url, headers=headers, data=request.data
+    )
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    build: Callable[[Dataset], Request],
+    dataset: Dataset,
+    rate: float,
+    duration: float,
+    concurrency: int,
+) -> dict:
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def timed(scheduled: float, request: Request) -> None:
+        nonlocal errors
+        async with semaphore:
+            try:
+                response = await send(client, request)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+        if failed:
+            errors += 1
+        else:
+            latencies.append(loop.time() - scheduled)
+
+    tasks = []
+    start = loop.time()
+    for i in range(int(rate * duration)):
+        scheduled = start + i / rate
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(timed(scheduled, build(dataset))))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    latencies.sort()
+    result = {
+        "requests": len(tasks),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+    }
+    for name, fraction in (("p50_ms", 0.50), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+        value = percentile(latencies, fraction)
+        result[name] = round(value * 1000, 2) if value is not None else None
+    return result
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list[str]:
+    """Annotate report with changes against baseline, return regressed endpoints"""
+    regressed = []
+    for name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if not previous or not previous["p95_ms"] or not current["p95_ms"]:
+            continue
+        p95_change = (current["p95_ms"] / previous["p95_ms"] - 1) * 100
+        current["baseline"] = {
+            "p95_ms": previous["p95_ms"],
+            "p95_change_pct": round(p95_change, 1),
+            "throughput_rps": previous["throughput_rps"],
+        }
+        if p95_change > max_regression:
+            regressed.append(name)
+    return regressed
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with open(args.manifest) as file:
+        manifest = json.load(file)
+    rng = random.Random(manifest["seed"])
+    names = args.endpoints or list(ENDPOINTS)
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        tokens = []
+        for email in manifest["emails"][: args.clients]:
+            response = await client.post(
+                "/api/users/login",
+                data={"username": email, "password": manifest["password"]},
+            )
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+        dataset = Dataset(manifest, tokens, rng)
+
+        endpoints = {}
+        for name in names:
+            endpoints[name] = await drive(
+                client,
+                ENDPOINTS[name],
+                dataset,
+                args.rate,
+                args.duration,
+                args.concurrency,
+            )
+            print(f"{name}: {endpoints[name]}", file=sys.stderr)
+
+    return {
+        "meta": {
+            "time": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "rate": args.rate,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "clients": len(tokens),
+            "python": platform.python_version(),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--manifest", default="benchmarks/dataset.json")
+    parser.add_argument("--rate", type=float, default=50, help="Requests per second")
+    parser.add_argument(
+        "--duration", type=float, default=20, help="Seconds per endpoint"
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=20, help="Users to log in")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--endpoints", nargs="*", choices=list(ENDPOINTS))
+    parser.add_argument("--output", help="Write JSON report to this file")
+    parser.add_argument("--baseline", help="Compare against a previous report")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10,
+        help="Fail when p95 grows by more than this percentage over the baseline",
+    )
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressed = compare(report, json.load(file), args.max_regression)
+        report["regressed"] = regressed
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    print(output)
+
+    if regressed:
+        sys.exit(f"p95 regressed on: {', '.join(regressed)}")
+
+
+if __name__ == "__main__":
+    main()
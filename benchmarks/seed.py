@@ -0,0 +1,192 @@
+"""Seed Postgres with a reproducible synthetic dataset for load tests
+
+Likes follow a Zipf distribution over posts, so a few posts get most of them.
+Writes a manifest that benchmarks.loadtest reads to build requests.
+
+Run: python -m benchmarks.seed --reset --users 1000 --posts 20000 --likes 100000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, text, update
+from app.databases import engine
+from app.models.categories import Category
+from app.models.likes import Like
+from app.models.posts import Post
+from app.models.users import User
+from app.reconcile import reconcile_likes_count
+from app.settings import TRENDING_HALF_LIFE_SECONDS
+from app.stats import rebuild_stats
+from app.utils import hashed_password
+
+CHUNK_SIZE = 5000
+EMAIL_TEMPLATE = "bench-{}@example.com"
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua python postgres async database"
+).split()
+
+
+def chunks(rows: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+def sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def zipf_weights(count: int, exponent: float) -> list[float]:
+    """Cumulative weights of ranks 1..count for random.choices"""
+    weights = (1 / rank**exponent for rank in range(1, count + 1))
+    return list(itertools.accumulate(weights))
+
+
+async def bulk_insert(conn, table, rows: list, *columns) -> list:
+    """Insert rows, return (id, *columns) of each inserted row
+
+    executemany RETURNING does not promise input order, so callers match the
+    returned rows to their input by the extra columns, never by position.
+    """
+    returned = []
+    for chunk in chunks(rows):
+        result = await conn.execute(
+            insert(table).returning(table.c.id, *columns), chunk
+        )
+        returned.extend(result.all())
+    return returned
+
+
+async def seed_trending_scores() -> None:
+    """Score each post by its likes, decayed by post age, as of now"""
+    age = func.extract("epoch", func.now() - Post.time_created)
+    async with engine.begin() as conn:
+        await conn.execute(
+            update(Post)
+            .where(Post.likes_count > 0)
+            .values(
+                trending_score=Post.likes_count
+                * func.power(2.0, -age / TRENDING_HALF_LIFE_SECONDS),
+                trending_updated=func.now(),
+            )
+        )
+
+
+async def seed(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    password = await hashed_password(args.password)
+    now = datetime.now(timezone.utc)
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.execute(
+                text(
+                    "TRUNCATE likes, posts, categories, users, category_stats, "
+                    "user_stats RESTART IDENTITY CASCADE"
+                )
+            )
+
+        emails = [EMAIL_TEMPLATE.format(i) for i in range(args.users)]
+        users = await bulk_insert(
+            conn,
+            User.__table__,
+            [{"email": email, "password": password} for email in emails],
+            User.__table__.c.email,
+        )
+        ids_by_email = {email: user_id for user_id, email in users}
+        user_ids = [ids_by_email[email] for email in emails]
+        categories = await bulk_insert(
+            conn,
+            Category.__table__,
+            [{"title": f"Bench category {i}"} for i in range(args.categories)],
+        )
+        category_ids = sorted(category_id for category_id, in categories)
+
+        post_rows = []
+        for _ in range(args.posts):
+            created = now - timedelta(seconds=rng.uniform(0, args.days * 86400))
+            post_rows.append(
+                {
+                    "title": sentence(rng, 5),
+                    "content": sentence(rng, 60),
+                    "category_id": rng.choice(category_ids),
+                    "user_id": rng.choice(user_ids),
+                    "time_created": created,
+                    "time_updated": created,
+                    "likes_count": 0,
+                }
+            )
+        posts = await bulk_insert(
+            conn, Post.__table__, post_rows, Post.__table__.c.user_id
+        )
+        owners = dict(posts)
+
+        # Popularity rank of each post, most liked first
+        ranked = sorted(owners)
+        rng.shuffle(ranked)
+        weights = zipf_weights(len(ranked), args.zipf)
+
+        pairs = set()
+        attempts = 0
+        while len(pairs) < args.likes and attempts < args.likes * 10:
+            attempts += 1
+            post_id = rng.choices(ranked, cum_weights=weights)[0]
+            user_id = rng.choice(user_ids)
+            if user_id != owners[post_id]:
+                pairs.add((post_id, user_id))
+
+        like_rows = [
+            {"post_id": post_id, "user_id": user_id, "liked": True}
+            for post_id, user_id in sorted(pairs)
+        ]
+        for chunk in chunks(like_rows):
+            await conn.execute(insert(Like.__table__), chunk)
+
+    await reconcile_likes_count()
+    await seed_trending_scores()
+    await rebuild_stats()
+    await engine.dispose()
+
+    return {
+        "seed": args.seed,
+        "password": args.password,
+        "emails": emails,
+        "user_ids": user_ids,
+        "category_ids": category_ids,
+        # [post_id, owner_id] ordered by popularity rank
+        "posts": [[post_id, owners[post_id]] for post_id in ranked],
+        "zipf": args.zipf,
+        "likes": len(like_rows),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--likes", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=30, help="Spread of post dates")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Likes skew exponent")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument(
+        "--reset", action="store_true", help="Truncate all tables before seeding"
+    )
+    parser.add_argument("--manifest", default="benchmarks/dataset.json")
+    args = parser.parse_args()
+
+    manifest = asyncio.run(seed(args))
+    with open(args.manifest, "w") as file:
+        json.dump(manifest, file)
+    print(
+        f"Seeded {len(manifest['user_ids'])} users, {len(manifest['posts'])} posts, "
+        f"{manifest['likes']} likes, manifest written to {args.manifest}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-row cost of post list serialization, pydantic path vs fast path
+
+Run: python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from fastapi.encoders import jsonable_encoder
+from app.schemas.posts import PostPageScheme
+from app.serialization import dumps
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    now = datetime.now(timezone.utc)
+    return [
+        SimpleNamespace(
+            title=f"Title {i}",
+            content="Lorem ipsum dolor sit amet " * 20,
+            id=i,
+            category_id=i % 10,
+            user_id=i % 100,
+            time_created=now,
+            time_updated=now,
+            likes_count=i % 1000,
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(rows: list) -> bytes:
+    """What FastAPI does for response_model with orm_mode objects"""
+    page = PostPageScheme(items=rows, next_cursor=None)
+    return json.dumps(jsonable_encoder(page)).encode()
+
+
+def fast_path(rows: list) -> bytes:
+    items = [dict(vars(row)) for row in rows]
+    return dumps({"items": items, "next_cursor": None})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(pydantic_path(rows)) == json.loads(fast_path(rows))
+
+    results = {}
+    for name, func in (("pydantic", pydantic_path), ("fast", fast_path)):
+        seconds = min(timeit.repeat(lambda: func(rows), number=1, repeat=args.repeat))
+        results[name] = {"per_row_us": round(seconds / args.rows * 1e6, 3)}
+
+    results["speedup"] = round(
+        results["pydantic"]["per_row_us"] / results["fast"]["per_row_us"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
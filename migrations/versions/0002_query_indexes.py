@@ -0,0 +1,75 @@
+"""Indexes for list, favorites and like queries
+
+Indexes are built with CREATE INDEX CONCURRENTLY outside of a transaction,
+so production tables stay writable while they are created. A failed
+concurrent build leaves an INVALID index that IF NOT EXISTS would keep, so
+invalid leftovers are dropped first.
+
+Revision ID: 0002_query_indexes
+Revises: 0001_initial
+Create Date: 2023-03-01 00:00:01
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_query_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_posts_time_created_id": "posts (time_created, id)",
+    "ix_posts_user_id_time_created_id": "posts (user_id, time_created, id)",
+    "ix_posts_category_id": "posts (category_id)",
+    "ix_likes_user_id_liked_post_id": "likes (user_id, liked, post_id)",
+}
+
+
+def drop_invalid_index(name: str) -> None:
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+            "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+        ),
+        {"name": name},
+    )
+    if invalid.scalar() is not None:
+        op.execute(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def upgrade() -> None:
+    # Unique (post_id, user_id) fails on duplicated likes, keep the oldest one
+    op.execute(
+        """
+        DELETE FROM likes
+        USING likes AS older
+        WHERE likes.post_id = older.post_id
+          AND likes.user_id = older.user_id
+          AND likes.id > older.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            drop_invalid_index(name)
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}"
+            )
+        drop_invalid_index("uq_likes_post_id_user_id")
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_likes_post_id_user_id "
+            "ON likes (post_id, user_id)"
+        )
+
+    op.execute(
+        "ALTER TABLE likes ADD CONSTRAINT uq_likes_post_id_user_id "
+        "UNIQUE USING INDEX uq_likes_post_id_user_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_likes_post_id_user_id", "likes", type_="unique")
+
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
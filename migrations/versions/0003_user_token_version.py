@@ -0,0 +1,25 @@
+"""users.token_version for access token revocation
+
+Revision ID: 0003_user_token_version
+Revises: 0002_query_indexes
+Create Date: 2023-03-01 00:00:02
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_user_token_version"
+down_revision = "0002_query_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant default, added without rewriting the table
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
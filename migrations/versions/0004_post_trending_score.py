@@ -0,0 +1,36 @@
+"""posts.trending_score and posts.trending_updated
+
+Revision ID: 0004_post_trending_score
+Revises: 0003_user_token_version
+Create Date: 2023-03-01 00:00:03
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004_post_trending_score"
+down_revision = "0003_user_token_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "posts",
+        sa.Column("trending_score", sa.Float(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "posts",
+        sa.Column("trending_updated", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_posts_trending_updated "
+            "ON posts (trending_updated)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_trending_updated", table_name="posts")
+    op.drop_column("posts", "trending_updated")
+    op.drop_column("posts", "trending_score")
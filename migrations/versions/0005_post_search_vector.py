@@ -0,0 +1,43 @@
+"""posts.search_vector generated tsvector with GIN index
+
+Adding a stored generated column rewrites the posts table under an exclusive
+lock, run this revision in a maintenance window on large tables. The index
+itself is built concurrently.
+
+Revision ID: 0005_post_search_vector
+Revises: 0004_post_trending_score
+Create Date: 2023-03-01 00:00:04
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+revision = "0005_post_search_vector"
+down_revision = "0004_post_trending_score"
+branch_labels = None
+depends_on = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        "posts",
+        sa.Column(
+            "search_vector", TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True)
+        ),
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_posts_search_vector "
+            "ON posts USING gin (search_vector)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_posts_search_vector", table_name="posts")
+    op.drop_column("posts", "search_vector")
@@ -0,0 +1,38 @@
+"""category_stats and user_stats aggregate tables
+
+Fill them with `python -m app.stats` after upgrading.
+
+Revision ID: 0006_aggregate_stats
+Revises: 0005_post_search_vector
+Create Date: 2023-03-01 00:00:05
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_aggregate_stats"
+down_revision = "0005_post_search_vector"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "category_stats",
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column("posts_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("category_id"),
+    )
+    op.create_table(
+        "user_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("posts_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("likes_received", sa.Integer(), nullable=False, server_default="0"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_stats")
+    op.drop_table("category_stats")
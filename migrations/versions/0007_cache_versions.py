@@ -0,0 +1,26 @@
+"""cache_versions table for cross-worker cache invalidation
+
+Revision ID: 0007_cache_versions
+Revises: 0006_aggregate_stats
+Create Date: 2023-03-01 00:00:06
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007_cache_versions"
+down_revision = "0006_aggregate_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cache_versions")
@@ -0,0 +1,102 @@
+"""Tests run the app against a real Postgres database
+
+Connection settings come from POSTGRES_HOST / POSTGRES_PORT / POSTGRES_USER /
+POSTGRES_PASSWORD. The database named by TEST_POSTGRES_NAME is created if
+missing and its tables are recreated, so never point it at real data.
+"""
+import asyncio
+import os
+import uuid
+import asyncpg
+import pytest
+from .utils import register
+
+os.environ["POSTGRES_NAME"] = os.environ.get("TEST_POSTGRES_NAME", "social_test")
+os.environ.setdefault("POSTGRES_USER", "postgres")
+os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("KEY", "test-admin-key")
+os.environ["SCHEMA_MODE"] = "create"
+os.environ["WARMUP_ON_STARTUP"] = "false"
+
+
+async def _create_database() -> None:
+    conn = await asyncpg.connect(
+        host=os.environ.get("POSTGRES_HOST", "localhost"),
+        port=int(os.environ.get("POSTGRES_PORT", 5432)),
+        user=os.environ["POSTGRES_USER"],
+        password=os.environ["POSTGRES_PASSWORD"],
+        database="postgres",
+    )
+    try:
+        exists = await conn.fetchval(
+            "SELECT 1 FROM pg_database WHERE datname = $1", os.environ["POSTGRES_NAME"]
+        )
+        if not exists:
+            await conn.execute(f'CREATE DATABASE "{os.environ["POSTGRES_NAME"]}"')
+    finally:
+        await conn.close()
+
+
+async def _recreate_tables() -> None:
+    from app.databases import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def app():
+    try:
+        asyncio.run(_create_database())
+    except (OSError, asyncpg.PostgresError) as exc:
+        pytest.skip(f"Postgres is not available: {exc}")
+
+    from app.main import app
+
+    asyncio.run(_recreate_tables())
+    return app
+
+
+@pytest.fixture(autouse=True)
+def _fresh_like_counters_lock():
+    """Each test runs its own event loop, an asyncio.Lock binds to the first one"""
+    from app.counters import like_counters
+
+    like_counters._lock = asyncio.Lock()
+
+
+@pytest.fixture
+def client(app):
+    from fastapi.testclient import TestClient
+
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def create_post(client):
+    """Create a post owned by a new user in a new category"""
+
+    def create() -> dict:
+        admin = register(client, admin=True)
+        response = client.post(
+            "/api/categories/create",
+            json={"title": uuid.uuid4().hex},
+            headers=admin["headers"],
+        )
+        assert response.status_code == 201, response.text
+        category_id = response.json()["id"]
+
+        owner = register(client)
+        response = client.post(
+            "/api/posts/create",
+            json={"title": "Title", "content": "Content", "category_id": category_id},
+            headers=owner["headers"],
+        )
+        assert response.status_code == 201, response.text
+        return {**response.json(), "owner": owner}
+
+    return create
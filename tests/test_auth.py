@@ -0,0 +1,13 @@
+from jose import jwt
+
+
+def test_token_without_exp_is_rejected(app, client):
+    from app.settings import ALGORITHM
+    from app.utils import JWT_SECRET_KEY
+
+    token = jwt.encode(
+        {"sub": "nobody@example.com", "uid": 1, "ver": 0}, JWT_SECRET_KEY, ALGORITHM
+    )
+
+    response = client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
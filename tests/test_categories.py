@@ -0,0 +1,63 @@
+from .utils import register
+
+
+def test_categories_version_follows_writes(client):
+    admin = register(client, admin=True)
+
+    response = client.get("/api/categories/list", headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    version = int(response.headers["X-Categories-Version"])
+
+    response = client.post(
+        "/api/categories/create", json={"title": "Versioned"}, headers=admin["headers"]
+    )
+    assert response.status_code == 201, response.text
+    category_id = response.json()["id"]
+
+    response = client.get(f"/api/categories/{category_id}", headers=admin["headers"])
+    assert response.status_code == 200, response.text
+    assert int(response.headers["X-Categories-Version"]) == version + 1
+
+
+def test_category_changed_elsewhere_is_reloaded(app, client, monkeypatch):
+    from app.cache import category_cache
+
+    monkeypatch.setattr(category_cache, "stale_seconds", 0)
+    admin = register(client, admin=True)
+    response = client.post(
+        "/api/categories/create", json={"title": "Before"}, headers=admin["headers"]
+    )
+    category_id = response.json()["id"]
+    client.get("/api/categories/list", headers=admin["headers"])
+
+    # Simulate another worker: the write bumps the version in the database,
+    # but this worker's snapshot is not invalidated locally
+    invalidate = category_cache.invalidate
+    category_cache.invalidate = lambda: None
+    try:
+        response = client.put(
+            f"/api/categories/{category_id}/update",
+            json={"title": "After"},
+            headers=admin["headers"],
+        )
+        assert response.status_code == 201, response.text
+    finally:
+        category_cache.invalidate = invalidate
+
+    response = client.get(f"/api/categories/{category_id}", headers=admin["headers"])
+    assert response.json()["title"] == "After"
+
+
+def test_version_is_checked_once_per_stale_window(app, client, monkeypatch):
+    from app.cache import category_cache
+
+    admin = register(client, admin=True)
+    client.get("/api/categories/list", headers=admin["headers"])
+
+    async def fail(db):
+        raise AssertionError("version checked within the stale window")
+
+    monkeypatch.setattr(category_cache, "stale_seconds", 3600)
+    monkeypatch.setattr(category_cache, "_current_version", fail)
+    response = client.get("/api/categories/list", headers=admin["headers"])
+    assert response.status_code == 200, response.text
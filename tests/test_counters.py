@@ -0,0 +1,83 @@
+import asyncio
+import uuid
+from sqlalchemy import insert, select
+
+
+async def _create_post() -> int:
+    from app.databases import SessionLocal
+    from app.models.categories import Category
+    from app.models.posts import Post
+    from app.models.users import User
+
+    async with SessionLocal() as session:
+        user_id = await session.scalar(
+            insert(User)
+            .values(email=f"{uuid.uuid4().hex}@example.com", password="x")
+            .returning(User.id)
+        )
+        category_id = await session.scalar(
+            insert(Category).values(title=uuid.uuid4().hex).returning(Category.id)
+        )
+        post_id = await session.scalar(
+            insert(Post)
+            .values(
+                title="Title",
+                content="Content",
+                user_id=user_id,
+                category_id=category_id,
+                likes_count=0,
+            )
+            .returning(Post.id)
+        )
+        await session.commit()
+    return post_id
+
+
+async def _likes_count(post_id: int) -> int:
+    from app.databases import SessionLocal
+    from app.models.posts import Post
+
+    async with SessionLocal() as session:
+        return await session.scalar(select(Post.likes_count).where(Post.id == post_id))
+
+
+async def _stop_during_flush() -> tuple:
+    from app.counters import LikeCounterBuffer
+    from app.databases import engine
+
+    buffer = LikeCounterBuffer(enabled=True, interval=0.01, max_pending=1000)
+    try:
+        post_id = await _create_post()
+        buffer.add(post_id, 3)
+        buffer.start()
+        while not buffer._flushing:
+            await asyncio.sleep(0)
+
+        await buffer.stop()
+        return await _likes_count(post_id), buffer.pending(post_id)
+    finally:
+        await engine.dispose()
+
+
+async def _flush_clears_pending() -> tuple:
+    from app.counters import LikeCounterBuffer
+    from app.databases import engine
+
+    buffer = LikeCounterBuffer(enabled=True, interval=60, max_pending=1000)
+    try:
+        post_id = await _create_post()
+        buffer.add(post_id, 2)
+        buffer.add(post_id, -1)
+        before = buffer.pending(post_id)
+        flushed = await buffer.flush()
+        return before, flushed, buffer.pending(post_id), await _likes_count(post_id)
+    finally:
+        await engine.dispose()
+
+
+def test_flush_applies_and_clears_pending(app):
+    assert asyncio.run(_flush_clears_pending()) == (1, 1, 0, 1)
+
+
+def test_stop_during_flush_keeps_deltas(app):
+    assert asyncio.run(_stop_during_flush()) == (3, 0)
@@ -0,0 +1,32 @@
+import time
+from starlette.requests import Request
+from .utils import register
+
+
+def _request(cookie: str = None) -> Request:
+    headers = []
+    if cookie is not None:
+        headers.append((b"cookie", f"last_write={cookie}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+def test_write_sets_last_write_cookie(client):
+    user = register(client)
+
+    response = client.post(
+        "/api/categories/create", json={"title": "x"}, headers=user["headers"]
+    )
+    assert "last_write" not in response.cookies
+
+    response = client.post("/api/users/logout-all", headers=user["headers"])
+    assert float(response.cookies["last_write"]) <= time.time()
+
+
+def test_wrote_recently_reads_cookie(app):
+    from app.dependencies import _wrote_recently
+
+    assert _wrote_recently(_request(str(time.time())))
+    assert not _wrote_recently(_request(str(time.time() - 3600)))
+    assert not _wrote_recently(_request(str(time.time() + 3600)))
+    assert not _wrote_recently(_request("garbage"))
+    assert not _wrote_recently(_request())
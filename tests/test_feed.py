@@ -0,0 +1,65 @@
+from collections import deque
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from app.feed import FeedCache, UserFeed, insert_key
+
+NOW = datetime(2023, 3, 1)
+
+
+def key(seconds: int, post_id: int) -> tuple:
+    return NOW + timedelta(seconds=seconds), post_id
+
+
+def post(seconds: int, post_id: int, category_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        time_created=NOW + timedelta(seconds=seconds),
+        id=post_id,
+        category_id=category_id,
+    )
+
+
+def test_insert_key_keeps_newest_first():
+    keys = deque([key(30, 3), key(10, 1)], maxlen=3)
+
+    insert_key(keys, key(20, 2))
+    insert_key(keys, key(20, 2))
+    assert list(keys) == [key(30, 3), key(20, 2), key(10, 1)]
+
+    insert_key(keys, key(5, 0))
+    assert list(keys) == [key(30, 3), key(20, 2), key(10, 1)]
+
+    insert_key(keys, key(25, 4))
+    assert list(keys) == [key(30, 3), key(25, 4), key(20, 2)]
+
+
+def test_post_committed_out_of_order_stays_sorted():
+    feeds = FeedCache(max_users=10, size=10, recent_size=10, ttl=60)
+    feed = UserFeed(frozenset({1}), [], 10)
+    feeds._store(1, feed)
+
+    feeds.on_post_created(post(20, 2))
+    feeds.on_post_created(post(10, 1))
+    assert list(feed.keys) == [key(20, 2), key(10, 1)]
+
+
+def test_subscribers_follow_cached_users():
+    feeds = FeedCache(max_users=2, size=10, recent_size=10, ttl=60)
+    for user_id in (1, 2, 3):
+        feeds._store(user_id, UserFeed(frozenset({user_id}), [], 10))
+
+    assert feeds._subscribers == {2: {2}, 3: {3}}
+
+    feeds._users.invalidate(2)
+    assert feeds._subscribers == {3: {3}}
+
+
+def test_unlike_rebuilds_feed_of_subscribed_category():
+    feeds = FeedCache(max_users=10, size=10, recent_size=10, ttl=60)
+    feeds._store(1, UserFeed(frozenset({1}), [], 10))
+
+    feeds.on_unlike(1, 2)
+    assert feeds._users.get(1) is not None
+
+    feeds.on_unlike(1, 1)
+    assert feeds._users.get(1) is None
+    assert feeds._subscribers == {}
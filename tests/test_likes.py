@@ -0,0 +1,66 @@
+from .utils import register
+
+
+def test_like_and_unlike_post(client, create_post):
+    post = create_post()
+    user = register(client)
+
+    response = client.post(f"/api/likes/add/{post['id']}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "message": "Post was successfully liked",
+        "likes_count": 1,
+    }
+
+    response = client.get(f"/api/posts/{post['id']}", headers=user["headers"])
+    assert response.json()["likes_count"] == 1
+
+    response = client.post(f"/api/likes/add/{post['id']}", headers=user["headers"])
+    assert response.status_code == 200, response.text
+    assert response.json() == {
+        "message": "Post was successfully unliked",
+        "likes_count": 0,
+    }
+
+    response = client.get(f"/api/posts/{post['id']}", headers=user["headers"])
+    assert response.json()["likes_count"] == 0
+
+
+def test_owner_cannot_like_post(client, create_post):
+    post = create_post()
+
+    response = client.post(
+        f"/api/likes/add/{post['id']}", headers=post["owner"]["headers"]
+    )
+    assert response.status_code == 403
+
+
+def test_like_missing_post(client):
+    user = register(client)
+
+    response = client.post("/api/likes/add/0", headers=user["headers"])
+    assert response.status_code == 404
+
+
+def test_write_behind_like_updates_stats_on_flush(client, create_post, monkeypatch):
+    from app.counters import like_counters
+
+    monkeypatch.setattr(like_counters, "enabled", True)
+    post = create_post()
+    user = register(client)
+    owner_stats = f"/api/stats/users/{post['owner']['id']}"
+
+    response = client.post(f"/api/likes/add/{post['id']}", headers=user["headers"])
+    assert response.json()["likes_count"] == 1
+    assert like_counters.pending_received(post["owner"]["id"]) == 1
+
+    response = client.get(owner_stats, headers=user["headers"])
+    assert response.json()["likes_received"] == 1
+
+    client.portal.call(like_counters.flush)
+    assert like_counters.pending_received(post["owner"]["id"]) == 0
+
+    response = client.get(owner_stats, headers=user["headers"])
+    assert response.json()["likes_received"] == 1
+    response = client.get(f"/api/posts/{post['id']}", headers=user["headers"])
+    assert response.json()["likes_count"] == 1
@@ -0,0 +1,30 @@
+import asyncio
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+def test_failed_statement_releases_start_time(app):
+    from app.databases import engine
+
+    async def run():
+        try:
+            async with engine.connect() as conn:
+                with pytest.raises(DBAPIError):
+                    await conn.execute(text("SELECT * FROM missing_table"))
+                await conn.rollback()
+                await conn.execute(text("SELECT 1"))
+                sync_conn = await conn.get_raw_connection()
+                return list(sync_conn.info.get("query_start", []))
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == []
+
+
+def test_totals_are_typed_as_counters(client):
+    body = client.get("/metrics").text
+
+    assert "# TYPE db_pool_checkouts_total counter" in body
+    assert "# TYPE token_cache_hits_total counter" in body
+    assert "# TYPE db_pool_wait_seconds_max gauge" in body
@@ -0,0 +1,42 @@
+import asyncio
+from unittest import mock
+import pytest
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+
+def test_waiting_for_a_connection_is_recorded(app):
+    from app.databases import MeteredQueuePool, PoolStats
+
+    def run() -> PoolStats:
+        pool = MeteredQueuePool(mock.Mock, pool_size=1, max_overflow=0, timeout=0.1)
+        pool.stats = PoolStats("test")
+        connection = pool.connect()
+        try:
+            with pytest.raises(TimeoutError):
+                pool.connect()
+        finally:
+            connection.close()
+        assert pool.recreate().stats is pool.stats
+        return pool.stats
+
+    stats = asyncio.run(greenlet_spawn(run))
+    assert stats.slow_checkouts == 1
+    assert stats.wait_seconds_max >= 0.1
+
+
+def test_opening_connections_is_not_counted_as_waiting(app):
+    from app.databases import engine
+    from app.warmup import warm_engine
+
+    async def run() -> tuple:
+        stats = engine.pool.stats
+        checkouts, waited = stats.checkouts, stats.wait_seconds_total
+        try:
+            await engine.dispose()
+            await warm_engine(engine, 3)
+        finally:
+            await engine.dispose()
+        return stats.checkouts - checkouts, stats.wait_seconds_total - waited
+
+    assert asyncio.run(run()) == (3, 0)
@@ -0,0 +1,39 @@
+import asyncio
+from sqlalchemy import insert, select
+from .test_counters import _create_post, _likes_count
+
+
+async def _reconcile_with_buffered_like(monkeypatch) -> tuple:
+    from app.counters import like_counters
+    from app.databases import SessionLocal, engine
+    from app.models.likes import Like
+    from app.models.posts import Post
+    from app.models.users import User
+    from app.reconcile import reconcile_likes_count
+
+    try:
+        post_id = await _create_post()
+        async with SessionLocal() as session:
+            user_id = await session.scalar(
+                select(User.id).join(Post, Post.user_id == User.id).limit(1)
+            )
+            await session.execute(
+                insert(Like).values(post_id=post_id, user_id=user_id, liked=True)
+            )
+            await session.commit()
+
+        # Like committed and buffered after reconcile's initial flush
+        with monkeypatch.context() as patch:
+            patch.setattr(like_counters, "flush", lambda: asyncio.sleep(0))
+            like_counters.add(post_id, 1)
+            await reconcile_likes_count()
+
+        after_reconcile = await _likes_count(post_id)
+        await like_counters.flush()
+        return after_reconcile, await _likes_count(post_id)
+    finally:
+        await engine.dispose()
+
+
+def test_reconcile_subtracts_buffered_likes(app, monkeypatch):
+    assert asyncio.run(_reconcile_with_buffered_like(monkeypatch)) == (0, 1)
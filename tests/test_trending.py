@@ -0,0 +1,35 @@
+import asyncio
+from sqlalchemy import select
+from .test_counters import _create_post
+
+
+async def _reload_with_buffered_like() -> tuple:
+    from app.counters import like_counters
+    from app.databases import SessionLocal, engine
+    from app.models.posts import Post
+    from app.trending import trending
+
+    try:
+        post_id = await _create_post()
+        async with SessionLocal() as session:
+            category_id = await session.scalar(
+                select(Post.category_id).where(Post.id == post_id)
+            )
+
+        # Write-behind like: in memory and buffered, not flushed yet
+        like_counters.add(post_id, 1)
+        trending.add(post_id, category_id, 1)
+        await trending.load()
+        after_reload = trending.top(category_id, 10)
+
+        await like_counters.flush()
+        await trending.load()
+        return post_id, after_reload, trending.top(category_id, 10)
+    finally:
+        await engine.dispose()
+
+
+def test_reload_keeps_buffered_likes(app):
+    post_id, after_reload, after_flush = asyncio.run(_reload_with_buffered_like())
+    assert after_reload == [post_id]
+    assert after_flush == [post_id]
@@ -0,0 +1,31 @@
+import asyncio
+from sqlalchemy import func, select
+
+
+def test_warm_engine_prepares_like_writes_without_keeping_them(app):
+    from app.databases import engine
+    from app.models.likes import Like
+    from app.models.stats import UserStats
+    from app.warmup import warm_engine
+
+    async def run():
+        try:
+            await warm_engine(engine, 1)
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                prepared = list(raw.dbapi_connection._prepared_statement_cache)
+                likes = await conn.scalar(select(func.count()).where(Like.user_id == 0))
+                stats = await conn.scalar(
+                    select(func.count()).where(UserStats.user_id == 0)
+                )
+            return prepared, likes, stats
+        finally:
+            await engine.dispose()
+
+    prepared, likes, stats = asyncio.run(run())
+    assert any(
+        sql.startswith("WITH toggled") and "INSERT INTO likes" in sql
+        for sql in prepared
+    )
+    assert any(sql.startswith("INSERT INTO user_stats") for sql in prepared)
+    assert (likes, stats) == (0, 0)
@@ -0,0 +1,25 @@
+import os
+import uuid
+
+
+def register(client, admin: bool = False) -> dict:
+    """Register and log in a new user, return auth headers and id"""
+    credentials = {"email": f"{uuid.uuid4().hex}@example.com", "password": "secret"}
+    if admin:
+        response = client.post(
+            "/api/users/create-admin",
+            params={"key": os.environ["KEY"]},
+            json=credentials,
+        )
+    else:
+        response = client.post("/api/users/register", json=credentials)
+    assert response.status_code == 201, response.text
+    user_id = response.json()["user"]["id"]
+
+    response = client.post(
+        "/api/users/login",
+        data={"username": credentials["email"], "password": credentials["password"]},
+    )
+    assert response.status_code == 200, response.text
+    token = response.json()["access_token"]
+    return {"id": user_id, "headers": {"Authorization": f"Bearer {token}"}}